@@ -1,8 +1,12 @@
+import os
+
 import streamlit as st
 from trans import EnhancedFoodDataProcessor
 
-# Initialize processor
-processor = EnhancedFoodDataProcessor()
+try:
+    from st_keyup import st_keyup
+except ImportError:
+    st_keyup = None
 
 # Page Config
 st.set_page_config(
@@ -11,6 +15,17 @@ st.set_page_config(
     layout="wide"
 )
 
+# Initialize processor once per server process; every session and rerun reuses it.
+# Edits to Dataset/food_database.json are picked up live without a restart.
+# MILLETMITRA_SEARCH_SHARDS=N moves name search into N shard processes for very large catalogs.
+@st.cache_resource(show_spinner=False)
+def get_processor():
+    processor = EnhancedFoodDataProcessor(shards=int(os.environ.get("MILLETMITRA_SEARCH_SHARDS", "0")))
+    processor.watch_catalog(interval=2.0)
+    return processor
+
+processor = get_processor()
+
 # Custom CSS for better aesthetics
 st.markdown("""
 <style>
@@ -47,6 +62,8 @@ with st.sidebar:
         "🔍 Search Food Item",
         "⚖️ Compare Nutrition",
         "🍽️ Meal Suggestions",
+        "🔬 Nutrient Query",
+        "🔁 Find Substitutes",
         "📂 Browse by Category"
     ])
 
@@ -55,9 +72,25 @@ if menu == "🔍 Search Food Item":
     st.header("🔍 Search for a Food Item")
     st.markdown("Enter any name in English, Telugu, Hindi, Tamil, Kannada, or phonetic spelling.")
 
-    query = st.text_input("Enter food name (e.g., 'Ragi', 'Raagulu', 'రాగులు'):")
-    
-    if st.button("🔎 Search"):
+    label = "Enter food name (e.g., 'Ragi', 'Raagulu', 'రాగులు'):"
+    # Rerun on every keystroke when streamlit-keyup is installed, otherwise on Enter
+    query = st_keyup(label, debounce=150, key="search_query") if st_keyup else st.text_input(label, key="search_query")
+    query = query or ""
+    if st_keyup is None:
+        st.caption("Press Enter to update suggestions (install streamlit-keyup to see them as you type).")
+
+    picked = None
+    suggestions = processor.autocomplete(query, limit=8)
+    if suggestions:
+        st.caption("Suggestions:")
+        columns = st.columns(4)
+        for i, suggestion in enumerate(suggestions):
+            caption = f"{suggestion['english']} ({suggestion['telugu']})"
+            if columns[i % 4].button(caption, key=f"suggestion_{suggestion['telugu']}"):
+                picked = suggestion['telugu']
+
+    if st.button("🔎 Search") or picked:
+        query = picked or query
         if not query.strip():
             st.warning("Please enter a valid food name.")
         else:
@@ -90,17 +123,35 @@ elif menu == "⚖️ Compare Nutrition":
             st.warning("Please enter at least one food name.")
         else:
             names = [x.strip() for x in food_list.split(",") if x.strip()]
-            comparison = processor.create_nutrition_comparison(names)
+            comparison = processor.compare_nutrition_values(names)
             if comparison:
-                st.write("### 📊 Nutrition Comparison Table")
-                st.table({
-                    "Food": [c["name"] for c in comparison],
-                    **{k: [c["nutrition"].get(k, "N/A") for c in comparison]
-                       for k in set().union(*(c["nutrition"].keys() for c in comparison))}
-                })
+                columns = [f"{n} ({u})" for n, u in zip(comparison["nutrients"], comparison["units"])]
+
+                def comparison_table(key):
+                    return {
+                        "Food": comparison["foods"],
+                        **{col: [row[i] for row in comparison[key]] for i, col in enumerate(columns)}
+                    }
+
+                st.write("### 📊 Nutrition Comparison Table (per 100g)")
+                st.dataframe(comparison_table("values"), use_container_width=True)
+                st.write("### 📈 Percent of Catalog Maximum")
+                st.dataframe(comparison_table("percent_of_max"), use_container_width=True)
+                st.write(f"### ➖ Difference vs {comparison['reference']}")
+                st.dataframe(comparison_table("difference"), use_container_width=True)
             else:
                 st.error("No valid food items found for comparison.")
 
+    st.markdown("---")
+    st.subheader("🏆 Rank the Catalog by Nutrient")
+    nutrient = st.selectbox("Nutrient:", processor.nutrient_matrix.nutrients)
+    top_n = st.slider("How many foods?", 1, 25, 10)
+    ranking = processor.rank_foods_by_nutrient(nutrient, limit=top_n)
+    st.table({
+        "Food": [f"{r['english']} ({r['telugu']})" for r in ranking],
+        f"{nutrient} ({processor.nutrient_matrix.unit(nutrient)})": [r["value"] for r in ranking]
+    })
+
 # --- Meal Suggestions Section ---
 elif menu == "🍽️ Meal Suggestions":
     st.header("🍽️ Get Personalized Meal Suggestions")
@@ -109,27 +160,196 @@ elif menu == "🍽️ Meal Suggestions":
     pref = st.selectbox("Choose dietary preference:", ["Balanced", "Diabetic", "Weight Loss"])
     
     if st.button("🍴 Get Suggestions"):
-        suggestions = processor.generate_meal_suggestions(pref.lower())
+        plan = processor.plan_meals(pref)
         st.markdown("### Here are your meal suggestions:")
-        for meal, items in suggestions.items():
+        for meal, items in plan["meals"].items():
             with st.expander(meal.capitalize()):
                 for item in items:
-                    st.markdown(f"- **{item['english']} ({item['telugu']})**: {', '.join(item['benefits'])}")
+                    st.markdown(f"- **{item['english']} ({item['telugu']})** – {item['portion_g']:.0f} g: {', '.join(item['benefits'])}")
+        units = {n: processor.nutrient_matrix.unit(n) for n in plan["targets"]}
+        st.markdown("### 🎯 Daily Nutrients vs Targets")
+        st.table({
+            "Nutrient": [f"{n} ({units[n]})" for n in plan["targets"]],
+            "Planned": [plan["totals"][n] for n in plan["targets"]],
+            "Target": [plan["targets"][n] for n in plan["targets"]]
+        })
+
+# --- Nutrient Query Section ---
+elif menu == "🔬 Nutrient Query":
+    st.header("🔬 Query Foods by Nutrients")
+    st.markdown("Filter by nutrient ranges, category and type, then rank by any nutrient (values per 100g).")
+
+    matrix = processor.nutrient_matrix
+    # Category and type names come from the facets precomputed at load time
+    facets = processor.browse_foods(page_size=1)["facets"]
+    col1, col2 = st.columns(2)
+    with col1:
+        category = st.selectbox("Category:", ["Any"] + sorted(facets["category"]))
+    with col2:
+        food_type = st.selectbox("Type:", ["Any"] + sorted(facets["type"]))
+
+    benefits = st.text_input("Benefits (optional):", placeholder="Gluten-free AND Blood sugar control AND NOT Grain",
+                             help="Benefits, categories or types combined with AND, OR, NOT and parentheses")
+
+    ranges = {}
+    for nutrient in st.multiselect("Nutrient ranges:", matrix.nutrients):
+        unit = matrix.unit(nutrient)
+        low_col, high_col = st.columns(2)
+        with low_col:
+            low = st.number_input(f"Min {nutrient} ({unit})", min_value=0.0, value=0.0, key=f"min_{nutrient}")
+        with high_col:
+            high = st.number_input(f"Max {nutrient} ({unit}, 0 = no limit)", min_value=0.0, value=0.0, key=f"max_{nutrient}")
+        ranges[nutrient] = (low or None, high or None)
+
+    sort_col, order_col, limit_col = st.columns(3)
+    with sort_col:
+        sort_by = st.selectbox("Sort by:", ["None"] + matrix.nutrients)
+    with order_col:
+        order = st.radio("Order:", ["Highest first", "Lowest first"], horizontal=True)
+    with limit_col:
+        limit = st.slider("Max results:", 1, 100, 10)
+
+    if st.button("🔎 Run Query"):
+        try:
+            results = processor.query_foods(
+                ranges=ranges,
+                sort_by=None if sort_by == "None" else sort_by,
+                limit=limit,
+                descending=order == "Highest first",
+                category=None if category == "Any" else category,
+                food_type=None if food_type == "Any" else food_type,
+                benefits=benefits.strip() or None
+            )
+        except ValueError as e:
+            st.error(str(e))
+            results = None
+        if results:
+            shown = list(results[0]["nutrition"])
+            st.dataframe({
+                "Food": [f"{r['english']} ({r['telugu']})" for r in results],
+                "Category": [r["category"] for r in results],
+                "Type": [r["type"] for r in results],
+                **{f"{n} ({matrix.unit(n)})": [r["nutrition"][n] for r in results] for n in shown}
+            }, use_container_width=True)
+        elif results is not None:
+            st.warning("No foods match these filters.")
+
+# --- Substitutes Section ---
+elif menu == "🔁 Find Substitutes":
+    st.header("🔁 Find Healthier Substitutes")
+    st.markdown("Foods with the closest nutrient profile, e.g. what can replace rice or wheat.")
+
+    matrix = processor.nutrient_matrix
+    col1, col2 = st.columns(2)
+    with col1:
+        food_name = st.text_input("Food to replace:", placeholder="rice")
+        scope = st.selectbox("Look in:", ["Same category", "Any category"] +
+                             sorted(processor.browse_foods(page_size=1)["facets"]["category"]))
+    with col2:
+        k = st.slider("Number of substitutes:", 1, 20, 5)
+        benefits = st.text_input("Required benefits (optional):", placeholder="Gluten-free AND NOT Grain")
+    emphasis = st.multiselect("Emphasize nutrients (weight x3):", matrix.nutrients)
+
+    if food_name.strip():
+        try:
+            result = processor.find_substitutes(
+                food_name, k=k,
+                weights={nutrient: 3.0 for nutrient in emphasis} or None,
+                category={"Same category": "same", "Any category": None}.get(scope, scope),
+                benefits=benefits.strip() or None
+            )
+        except ValueError as e:
+            st.error(str(e))
+            result = None
+        if result and "error" in result:
+            st.error(f"❌ {result['error']}")
+        elif result and result["substitutes"]:
+            st.markdown(f"### Substitutes for **{result['food']['english']} ({result['food']['telugu']})**")
+            st.dataframe({
+                "Food": [f"{s['english']} ({s['telugu']})" for s in result["substitutes"]],
+                "Category": [s["category"] for s in result["substitutes"]],
+                "Type": [s["type"] for s in result["substitutes"]],
+                "Distance": [s["distance"] for s in result["substitutes"]]
+            }, use_container_width=True)
+        elif result is not None:
+            st.warning("No foods match these constraints.")
 
 # --- Browse by Category Section ---
 elif menu == "📂 Browse by Category":
     st.header("📂 Browse Foods by Category")
-    categories = ["Millet", "Pulse", "Grain", "Spice", "Seeds"]
-    selected = st.selectbox("Select a category:", categories)
-    
-    if st.button("🧾 Show Foods"):
-        foods = processor.get_category_foods(selected)
-        if foods:
-            st.markdown(f"### Foods under category **{selected}**:")
-            for food in foods:
-                st.markdown(f"- **{food['english']} ({food['telugu']})**: {', '.join(food['benefits'])}")
-        else:
-            st.warning("No foods found in this category.")
+    category_counts = processor.browse_foods(page_size=1)["facets"]["category"]
+    col1, col2 = st.columns(2)
+    with col1:
+        selected = st.selectbox("Select a category:", list(category_counts),
+                                format_func=lambda c: f"{c} ({category_counts[c]})")
+    type_counts = processor.browse_foods(category=selected, page_size=1)["facets"]["type"]
+    with col2:
+        food_type = st.selectbox("Type:", ["Any"] + list(type_counts),
+                                 format_func=lambda t: t if t == "Any" else f"{t} ({type_counts[t]})")
+    benefits = st.text_input("Benefits (optional):", placeholder="Gluten-free AND NOT Blood sugar control",
+                             key="browse_benefits")
+    page_size = st.select_slider("Foods per page:", [10, 25, 50, 100], value=25)
+
+    # One cursor per page visited; changing any filter starts again from the first page
+    selection = (selected, food_type, benefits.strip(), page_size)
+    if st.session_state.get("browse_selection") != selection:
+        st.session_state.browse_selection = selection
+        st.session_state.browse_cursors = [None]
+    cursors = st.session_state.browse_cursors
+
+    try:
+        page = processor.browse_foods(selected, None if food_type == "Any" else food_type,
+                                      benefits.strip() or None, cursors[-1], page_size)
+    except ValueError as e:
+        if cursors[-1] is not None:
+            # The catalog changed under the cursor; start over
+            st.session_state.browse_cursors = [None]
+            st.rerun()
+        st.error(str(e))
+        page = None
+
+    if page is not None and page["total"]:
+        pages = -(-page["total"] // page_size)
+        st.markdown(f"### Foods under category **{selected}** ({page['total']}), page {len(cursors)} of {pages}:")
+        st.markdown("\n".join(f"- **{food['english']} ({food['telugu']})**: {', '.join(food['benefits'])}"
+                               for food in page["foods"]))
+        with st.expander("Benefits in this selection"):
+            st.markdown(" · ".join(f"{name} ({count})" for name, count in page["facets"]["benefit"].items()))
+        prev_col, next_col = st.columns(2)
+        with prev_col:
+            if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Next ➡️", disabled=page["next_cursor"] is None):
+                cursors.append(page["next_cursor"])
+                st.rerun()
+    elif page is not None:
+        st.warning("No foods found in this category.")
+
+# --- Diagnostics (rendered last so it includes this run's searches) ---
+with st.sidebar.expander("🩺 Search Diagnostics"):
+    # The processor is shared by every session, so only an actual toggle switches metrics,
+    # and the checkbox always shows the process-wide setting
+    st.session_state.collect_metrics = processor.metrics is not None
+    st.checkbox("Collect search metrics (all sessions)", key="collect_metrics",
+                on_change=lambda: processor.enable_metrics(st.session_state.collect_metrics))
+    stats = processor.search_stats()
+    cache = processor.cache_stats()
+    st.caption(f"Result cache: {cache['size']}/{cache['maxsize']} entries, {cache['hit_rate']:.0%} hit rate")
+    if "searches" in stats:
+        st.metric("Searches", stats["searches"], help=f"{stats['cached_searches']} served from cache")
+        st.caption(f"Results returned: {stats['results_returned']} | Empty: {stats['empty_searches']} | "
+                   f"Fuzzy candidates scored: {stats['fuzzy_candidates_scored']}")
+        st.dataframe({
+            "Stage": list(stats["stages"]),
+            "Runs": [s["count"] for s in stats["stages"].values()],
+            "Hits": [s["hits"] for s in stats["stages"].values()],
+            "Mean (ms)": [s["mean_ms"] for s in stats["stages"].values()],
+            "p99 ≤ (ms)": [s["p99_ms"] for s in stats["stages"].values()],
+        }, use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Prometheus metrics", processor.metrics_text(), file_name="milletmitra.prom",
+                           mime="text/plain")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,226 @@
+"""Scaling benchmarks for every public EnhancedFoodDataProcessor method.
+
+    python benchmark.py --sizes 1000,10000 --output bench.json
+    python benchmark.py --sizes 1000,10000 --baseline bench.json
+
+For each catalog size a synthetic catalog is generated (see synthetic.py), the
+processor is built from it, and every method is called with arguments drawn from
+a mixed query workload. Throughput and p50/p99 latency come from a timed pass;
+peak memory comes from a separate, shorter pass under tracemalloc so tracing does
+not distort the timings.
+"""
+import argparse
+import collections
+import collections.abc
+import io
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from catalog import FoodCatalog
+from loadtest import percentile
+from synthetic import generate_catalog, generate_prefixes, generate_queries
+from trans import EnhancedFoodDataProcessor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+PREFERENCES = ['balanced', 'diabetic', 'weight_loss']
+
+
+def _cases(processor, data, queries, prefixes, directory, rng):
+    """method name -> (argument factory, max calls); a factory returns the args of one call"""
+    names = [query for _, query in queries]
+    english = [entry['english'] for entry in data.values()]
+    categories = sorted({entry['category'] for entry in data.values()})
+    benefits = sorted({benefit for entry in data.values() for benefit in entry['benefits']})
+    nutrients = processor.nutrient_matrix.nutrients
+    food_names = lambda k: [rng.choice(english) for _ in range(k)]
+
+    changes = os.path.join(directory, 'changes.jsonl')
+    with open(changes, 'w', encoding='utf-8') as f:
+        for telugu, entry in rng.sample(list(data.items()), min(10, len(data))):
+            entry = dict(entry, benefits=list(entry['benefits']) + ['Benchmark edit'])
+            f.write(json.dumps({"telugu": telugu, **entry}, ensure_ascii=False) + '\n')
+
+    def query_ranges():
+        nutrient = rng.choice(nutrients)
+        values = processor.nutrient_index.sorted_values[processor.nutrient_matrix.column(nutrient)]
+        low = float(values[rng.randrange(len(values))]) if len(values) else None
+        return {nutrient: (low, None)}
+
+    return {
+        'search_food_item': (lambda: (rng.choice(names),), None),
+        'search_food_items': (lambda: (rng.sample(names, min(100, len(names))),), 200),
+        'autocomplete': (lambda: (rng.choice(prefixes),), None),
+        'get_food_info': (lambda: (rng.choice(names),), None),
+        'iter_food_info_batch': (lambda: (rng.sample(names, min(100, len(names))),), 200),
+        'get_food_info_batch': (lambda: (rng.sample(names, min(100, len(names))),), 200),
+        'get_category_foods': (lambda: (rng.choice(categories),), 50),
+        'browse_foods': (lambda: (rng.choice(categories), None, None, None, 20), None),
+        'find_foods': (lambda: (f'"{rng.choice(benefits)}" AND NOT {rng.choice(categories)}', 100), None),
+        'create_nutrition_comparison': (lambda: (food_names(5),), None),
+        'compare_nutrition_values': (lambda: (food_names(5),), None),
+        'rank_foods_by_nutrient': (lambda: (rng.choice(nutrients), 10), None),
+        'query_foods': (lambda: (query_ranges(), rng.choice(nutrients), 10), None),
+        'find_substitutes': (lambda: (rng.choice(names), 5), None),
+        'substitutes_table': (lambda: (5,), 1),
+        'generate_meal_suggestions': (lambda: (rng.choice(PREFERENCES),), 100),
+        'plan_meals': (lambda: (rng.choice(PREFERENCES),), 100),
+        'plan_meals_batch': (lambda: ([rng.choice(PREFERENCES) for _ in range(100)],), 20),
+        'create_retail_labels': (lambda: (food_names(5),), None),
+        'iter_retail_labels': (lambda: (food_names(5),), None),
+        'write_retail_labels': (lambda: (food_names(50), io.StringIO()), 200),
+        'cache_stats': (lambda: (), None),
+        'export_to_json': (lambda: (os.path.join(directory, 'export.json'),), 3),
+        'export_to_jsonl': (lambda: (os.path.join(directory, 'export.jsonl'),), 3),
+        'export_snapshot': (lambda: (os.path.join(directory, 'export.snap'),), 3),
+        # Last: it swaps in a new catalog
+        'import_changes': (lambda: (changes,), 1),
+    }
+
+
+def _call(method, args):
+    result = method(*args)
+    if isinstance(result, collections.abc.Iterator):
+        collections.deque(result, maxlen=0)
+
+
+def measure(method, make_args, iterations, budget, memory_calls=5):
+    """Time up to iterations calls (stopping after budget seconds), then trace peak memory"""
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < iterations and (len(latencies) < 3 or time.perf_counter() - started < budget):
+        args = make_args()
+        start = time.perf_counter()
+        _call(method, args)
+        latencies.append(time.perf_counter() - start)
+    elapsed = sum(latencies)
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(min(memory_calls, len(latencies))):
+            _call(method, make_args())
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "ops_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def run_size(size, queries=5000, iterations=2000, budget=5.0, seed=0, cache_size=1024, methods=None, shards=0):
+    """Benchmark every (or the selected) method against one synthetic catalog size"""
+    data = generate_catalog(size, seed=seed)
+    workload = generate_queries(data, queries, seed=seed)
+    prefixes = generate_prefixes(data, queries, seed=seed)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    processor = EnhancedFoodDataProcessor(catalog=FoodCatalog.from_dict(data, version=f"synthetic-{size}-{seed}"),
+                                          cache_size=cache_size, shards=shards)
+    build_s = time.perf_counter() - start
+    build_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    report = {
+        "foods": len(data),
+        "queries": dict(collections.Counter(kind for kind, _ in workload)),
+        "build": {"seconds": round(build_s, 3), "peak_kib": round(build_peak / 1024, 1)},
+        "methods": {}
+    }
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (make_args, limit) in _cases(processor, data, workload, prefixes, directory, rng).items():
+            if methods and name not in methods:
+                continue
+            calls = min(iterations, limit) if limit else iterations
+            report["methods"][name] = measure(getattr(processor, name), make_args, calls, budget)
+            logger.info(f"{size:>9} {name:<28} {report['methods'][name]}")
+    report["cache"] = processor.cache_stats()
+    processor.close()
+    return report
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(report, baseline):
+    """Lines of throughput ratios (new / baseline) for sizes and methods present in both runs"""
+    lines = []
+    for size, current in report["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if previous is None:
+            continue
+        for name, stats in current["methods"].items():
+            before = previous["methods"].get(name)
+            if before and before["ops_per_s"] and stats["ops_per_s"]:
+                lines.append(f"{size:>9} {name:<28} {stats['ops_per_s'] / before['ops_per_s']:6.2f}x  "
+                             f"p99 {before['p99_ms']:.3f} -> {stats['p99_ms']:.3f} ms")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the food data processor on synthetic catalogs")
+    parser.add_argument('--sizes', default='1000,10000',
+                        help=f"comma-separated catalog sizes (full scale: {','.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--queries', type=int, default=5000, help="size of the query workload")
+    parser.add_argument('--iterations', type=int, default=2000, help="max timed calls per method")
+    parser.add_argument('--budget', type=float, default=5.0, help="max seconds per method")
+    parser.add_argument('--cache-size', type=int, default=1024, help="result cache size (0 disables it)")
+    parser.add_argument('--methods', default=None, help="comma-separated subset of methods")
+    parser.add_argument('--shards', type=int, default=0, help="search shard processes (0 searches in-process)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    methods = set(args.methods.split(',')) if args.methods else None
+    report = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "cache_size": args.cache_size,
+            "shards": args.shards
+        },
+        "sizes": {}
+    }
+    for size in (int(size) for size in args.sizes.split(',')):
+        report["sizes"][str(size)] = run_size(size, args.queries, args.iterations, args.budget, args.seed,
+                                              args.cache_size, methods, args.shards)
+    report["meta"]["max_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results saved to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            print('\n'.join(compare(report, json.load(f))))
+
+
+if __name__ == "__main__":
+    main()
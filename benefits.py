@@ -0,0 +1,208 @@
+import re
+
+import numpy as np
+
+from search_index import normalize_query
+
+# Canonical benefit -> phrasings used for the same claim across the catalog
+BENEFIT_SYNONYMS = {
+    'Heart health': ['Heart healthy', 'Good for heart'],
+    'High fiber': ['High in fiber', 'Rich in fiber', 'Fiber rich'],
+    'High protein': ['Rich in protein', 'Protein rich'],
+    'Antioxidants': ['Antioxidant properties', 'High antioxidants', 'Rich in antioxidants'],
+    'Blood sugar control': ['Stable blood sugar', 'Good for diabetes', 'Anti-diabetic', 'Diabetic friendly'],
+    'Digestive health': ['Good for digestion', 'Improves digestion', 'Aids digestion'],
+    'Lowers cholesterol': ['Cholesterol reduction', 'Reduces cholesterol'],
+    'Bone health': ['Good for bones', 'Strong bones'],
+    'Weight management': ['Weight loss'],
+    'Energy source': ['Boosts energy', 'High energy', 'Quick energy'],
+    'Rich in iron': ['High iron', 'Iron rich'],
+    'High calcium': ['Rich in calcium', 'Calcium rich'],
+}
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+OPERATORS = {'and', 'or', 'not'}
+
+
+def fold_benefit(text):
+    """Comparison key for a benefit phrase: casefolded, hyphens and extra spaces removed"""
+    return normalize_query(str(text).replace('-', ' '))
+
+
+class BenefitVocabulary:
+    """Benefit phrases mapped to integer ids, with synonyms folded onto one id"""
+
+    def __init__(self, synonyms=BENEFIT_SYNONYMS):
+        self.names = []  # id -> canonical display name
+        self.ids = {}    # folded phrase -> id
+        for canonical, variants in synonyms.items():
+            benefit_id = self.add(canonical)
+            for variant in variants:
+                self.ids[fold_benefit(variant)] = benefit_id
+
+    def add(self, text):
+        """Id for a phrase, registering it as a new canonical benefit if unseen"""
+        key = fold_benefit(text)
+        benefit_id = self.ids.get(key)
+        if benefit_id is None:
+            benefit_id = self.ids[key] = len(self.names)
+            self.names.append(text)
+        return benefit_id
+
+    def get(self, text):
+        return self.ids.get(fold_benefit(text))
+
+    def canonical(self, text):
+        """Canonical name of a phrase (the phrase itself if unknown)"""
+        benefit_id = self.get(text)
+        return text if benefit_id is None else self.names[benefit_id]
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _bitset(rows, size):
+    """Python int with bit r set for every row r"""
+    mask = np.zeros(size, dtype=bool)
+    mask[rows] = True
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+class BenefitIndex:
+    """Per-benefit, per-category and per-type bitsets over catalog rows
+
+    Boolean queries combine whole-catalog bitsets with &, | and ~, so their cost does
+    not depend on how many foods match.
+    """
+
+    def __init__(self, catalog, vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else BenefitVocabulary()
+        self.size = len(catalog.records)
+        self.all_bits = (1 << self.size) - 1
+
+        benefit_rows, category_rows, type_rows = {}, {}, {}
+        self.category_names, self.type_names = {}, {}  # folded key -> first spelling seen
+        for row, record in enumerate(catalog.records):
+            for benefit in record.benefits:
+                benefit_rows.setdefault(self.vocabulary.add(benefit), []).append(row)
+            if record.category:
+                key = fold_benefit(record.category)
+                category_rows.setdefault(key, []).append(row)
+                self.category_names.setdefault(key, record.category)
+            if record.type:
+                key = fold_benefit(record.type)
+                type_rows.setdefault(key, []).append(row)
+                self.type_names.setdefault(key, record.type)
+        self.benefit_bits = {key: _bitset(rows, self.size) for key, rows in benefit_rows.items()}
+        self.category_bits = {key: _bitset(rows, self.size) for key, rows in category_rows.items()}
+        self.type_bits = {key: _bitset(rows, self.size) for key, rows in type_rows.items()}
+
+    def rows(self, bits):
+        """Ascending row numbers set in a bitset"""
+        if not bits:
+            return np.zeros(0, dtype=np.intp)
+        packed = np.frombuffer(bits.to_bytes((self.size + 7) // 8, 'little'), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(packed, bitorder='little')[:self.size])
+
+    def mask(self, bits):
+        """Boolean row mask for a bitset"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.rows(bits)] = True
+        return mask
+
+    def counts(self):
+        """Number of foods per canonical benefit, most common first"""
+        counts = {self.vocabulary.names[key]: bits.bit_count() for key, bits in self.benefit_bits.items()}
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def term(self, text):
+        """Bitset of one term: 'benefit:', 'category:' or 'type:' prefixed, or looked up in that order"""
+        kind, _, name = text.partition(':')
+        if name and kind.strip().lower() in ('benefit', 'category', 'type'):
+            kinds, text = (kind.strip().lower(),), name
+        else:
+            kinds = ('benefit', 'category', 'type')
+        key = fold_benefit(text)
+        for kind in kinds:
+            if kind == 'benefit':
+                benefit_id = self.vocabulary.get(text)
+                if benefit_id is not None:
+                    return self.benefit_bits.get(benefit_id, 0)
+            elif key in (self.category_bits if kind == 'category' else self.type_bits):
+                return (self.category_bits if kind == 'category' else self.type_bits)[key]
+        raise ValueError(f"Unknown {' or '.join(kinds)}: {text.strip()}")
+
+    def query(self, expression):
+        """Evaluate e.g. 'Gluten-free AND Blood sugar control AND NOT Grain' to a bitset
+
+        Operators are AND, OR, NOT (any case) with the usual precedence and parentheses;
+        adjacent words form one term, and "quoted" terms may contain operator words.
+        """
+        tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = TOKEN_PATTERN.match(expression, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Cannot parse benefit query at: {expression[position:]}")
+            position = match.end()
+            opening, closing, quoted, word = match.groups()
+            if opening or closing:
+                tokens.append(opening or closing)
+            elif quoted is not None:
+                tokens.append(('term', quoted))
+            elif word.lower() in OPERATORS:
+                tokens.append(word.lower())
+            elif tokens and isinstance(tokens[-1], tuple) and tokens[-1][0] == 'words':
+                tokens[-1] = ('words', f"{tokens[-1][1]} {word}")
+            else:
+                tokens.append(('words', word))
+        if not tokens:
+            raise ValueError("Empty benefit query")
+
+        tokens.append(None)
+        position = 0
+
+        def peek():
+            return tokens[position]
+
+        def take(expected=None):
+            nonlocal position
+            token = tokens[position]
+            if expected is not None and token != expected:
+                raise ValueError(f"Expected {expected!r} in benefit query, found {token!r}")
+            position += 1
+            return token
+
+        def parse_or():
+            bits = parse_and()
+            while peek() == 'or':
+                take()
+                bits |= parse_and()
+            return bits
+
+        def parse_and():
+            bits = parse_not()
+            while peek() == 'and':
+                take()
+                bits &= parse_not()
+            return bits
+
+        def parse_not():
+            if peek() == 'not':
+                take()
+                return self.all_bits & ~parse_not()
+            if peek() == '(':
+                take()
+                bits = parse_or()
+                take(')')
+                return bits
+            token = take()
+            if not isinstance(token, tuple):
+                raise ValueError(f"Expected a benefit, category or type in benefit query, found {token!r}")
+            return self.term(token[1])
+
+        bits = parse_or()
+        if peek() is not None:
+            raise ValueError(f"Unexpected {peek()!r} in benefit query")
+        return bits
@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+
+import numpy as np
+
+
+def encode_cursor(telugu_name):
+    """Opaque cursor pointing just past a food"""
+    return base64.urlsafe_b64encode(json.dumps({"after": telugu_name}).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Food a cursor points past, raising ValueError for a malformed cursor"""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))["after"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid browse cursor") from None
+
+
+class FacetIndex:
+    """Category x type x benefit counts, precomputed from a BenefitIndex at load time
+
+    Each (category, type) cell stores its food count and per-benefit counts, so facet
+    counts for any category/type selection are sums over a handful of cells. Selections
+    with a benefit expression fall back to bitset intersections.
+    """
+
+    def __init__(self, benefit_index):
+        self.benefit_index = benefit_index
+        names = benefit_index.vocabulary.names
+        self.cells = {}  # (category key, type key) -> (count, {benefit: count}); None where unset
+        for category, category_bits in self._groups(benefit_index.category_bits).items():
+            for food_type, type_bits in self._groups(benefit_index.type_bits).items():
+                cell = category_bits & type_bits
+                if cell:
+                    benefits = {names[key]: (cell & bits).bit_count() for key, bits in benefit_index.benefit_bits.items()}
+                    self.cells[(category, food_type)] = (cell.bit_count(),
+                                                         {name: n for name, n in benefits.items() if n})
+
+    def _groups(self, bits_by_key):
+        """The keyed bitsets plus a None group for foods with no value"""
+        unset = self.benefit_index.all_bits
+        for bits in bits_by_key.values():
+            unset &= ~bits
+        return {**bits_by_key, None: unset} if unset else dict(bits_by_key)
+
+    @staticmethod
+    def _named(counts, names):
+        counts = [(names.get(key, key), n) for key, n in counts.items() if key is not None and n]
+        return dict(sorted(counts, key=lambda item: (-item[1], item[0])))
+
+    def counts(self, category=None, food_type=None, bits=None):
+        """Facet counts for a selection: {"category": {...}, "type": {...}, "benefit": {...}}
+
+        Category counts ignore the category filter and type counts the type filter, so
+        each facet shows what choosing another value would give. bits, when given, is
+        an extra row bitset (e.g. from a benefit expression) every count is limited to.
+        """
+        index = self.benefit_index
+        if bits is None:
+            categories, types, benefits = {}, {}, {}
+            for (cell_category, cell_type), (count, cell_benefits) in self.cells.items():
+                if food_type is None or cell_type == food_type:
+                    categories[cell_category] = categories.get(cell_category, 0) + count
+                if category is None or cell_category == category:
+                    types[cell_type] = types.get(cell_type, 0) + count
+                    if food_type is None or cell_type == food_type:
+                        for name, n in cell_benefits.items():
+                            benefits[name] = benefits.get(name, 0) + n
+        else:
+            category_bits = index.category_bits.get(category, 0) if category is not None else index.all_bits
+            type_bits = index.type_bits.get(food_type, 0) if food_type is not None else index.all_bits
+            categories = {key: (b & type_bits & bits).bit_count() for key, b in index.category_bits.items()}
+            types = {key: (b & category_bits & bits).bit_count() for key, b in index.type_bits.items()}
+            selection = category_bits & type_bits & bits
+            names = index.vocabulary.names
+            benefits = {names[key]: (b & selection).bit_count() for key, b in index.benefit_bits.items()}
+        return {
+            "category": self._named(categories, index.category_names),
+            "type": self._named(types, index.type_names),
+            "benefit": self._named(benefits, {})
+        }
+
+
+def page_rows(rows, row_of, cursor, page_size):
+    """(rows of one page, last row or None if no page follows) after a cursor, rows ascending"""
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor)
+        if after not in row_of:
+            raise ValueError("Browse cursor refers to a food no longer in the catalog")
+        start = int(np.searchsorted(rows, row_of[after], side='right'))
+    page = rows[start:start + page_size]
+    more = start + page_size < len(rows)
+    return page, (int(page[-1]) if more and len(page) else None)
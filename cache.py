@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache with optional TTL, version invalidation and statistics"""
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.version = None
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        # Caller holds the lock; True when a call's version is the current one. The first
+        # version seen becomes current, later ones only through set_version, so a call still
+        # running on an older catalog can neither read nor write the newer one's entries.
+        if version is None or version == self.version:
+            return True
+        if self.version is not None:
+            return False
+        if self._data:
+            self.invalidations += 1
+        self._data.clear()
+        self.version = version
+        return True
+
+    def set_version(self, version):
+        """Make version current, dropping every entry cached under another one"""
+        with self._lock:
+            if version != self.version:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self.version = version
+
+    def get(self, key, default=None, version=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING) if self._check_version(version) else _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version=None):
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            if not self._check_version(version):
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, version=None):
+        """Return the cached value, computing (outside the lock) and storing it on a miss"""
+        value = self.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value, version=version)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
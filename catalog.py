@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dataset', 'food_database.json')
+
+SNAPSHOT_MAGIC = b'MMSNAP01'
+
+AMOUNT_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([^\d\s]*)\s*$')
+
+
+def parse_amount(text):
+    """Split a nutrition string like '344mg' into (344.0, 'mg'); (None, '') if unparseable"""
+    match = AMOUNT_PATTERN.match(str(text))
+    if not match:
+        return None, ''
+    return float(match.group(1)), sys.intern(match.group(2).lower())
+
+
+class FoodRecord:
+    """Read-only catalog entry that still supports the dict-style access used across the app"""
+
+    __slots__ = ('telugu', 'english', 'hindi', 'tamil', 'kannada', 'category', 'type', 'benefits', 'nutrients')
+
+    FIELDS = ('english', 'hindi', 'tamil', 'kannada', 'category', 'type', 'benefits', 'nutrition')
+
+    def __init__(self, telugu, english, hindi='', tamil='', kannada='', category='', type='',
+                 benefits=(), nutrition=None):
+        self.telugu = telugu
+        self.english = english
+        self.hindi = hindi
+        self.tamil = tamil
+        self.kannada = kannada
+        self.category = sys.intern(category)
+        self.type = sys.intern(type)
+        self.benefits = tuple(sys.intern(benefit) for benefit in benefits)
+        # (name, original text, value, unit) per nutrient, parsed once
+        self.nutrients = tuple(
+            (sys.intern(name), text) + parse_amount(text)
+            for name, text in (nutrition or {}).items()
+        )
+
+    @classmethod
+    def from_dict(cls, telugu, data):
+        """Build a record from one entry of the food_database JSON schema"""
+        return cls(
+            telugu,
+            data['english'],
+            hindi=data.get('hindi', ''),
+            tamil=data.get('tamil', ''),
+            kannada=data.get('kannada', ''),
+            category=data.get('category', ''),
+            type=data.get('type', ''),
+            benefits=data.get('benefits', ()),
+            nutrition=data.get('nutrition', {})
+        )
+
+    @classmethod
+    def from_fields(cls, telugu, english, hindi, tamil, kannada, category, type, benefits, nutrients):
+        """Build a record from already-parsed fields (nutrients as (name, text, value, unit) tuples)"""
+        record = cls.__new__(cls)
+        record.telugu = telugu
+        record.english = english
+        record.hindi = hindi
+        record.tamil = tamil
+        record.kannada = kannada
+        record.category = sys.intern(category)
+        record.type = sys.intern(type)
+        record.benefits = tuple(sys.intern(benefit) for benefit in benefits)
+        record.nutrients = tuple(nutrients)
+        return record
+
+    @property
+    def nutrition(self):
+        """Nutrition per 100g as the original display strings"""
+        return {name: text for name, text, _, _ in self.nutrients}
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        """Return the entry in the food_database JSON schema"""
+        data = {field: self[field] for field in self.FIELDS}
+        data['benefits'] = list(self.benefits)
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, FoodRecord):
+            return NotImplemented
+        return self.telugu == other.telugu and self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FoodRecord({self.telugu!r}, {self.english!r})"
+
+
+class FoodCatalog:
+    """Immutable food catalog keyed by Telugu name, shared by every processor in the process"""
+
+    def __init__(self, records, version=None, nutrient_columns=None):
+        self.records = tuple(records)
+        self.by_name = {record.telugu: record for record in self.records}
+        self.version = version
+        # Optional prebuilt (nutrients, units, values, mask) arrays, e.g. from a snapshot
+        self.nutrient_columns = nutrient_columns
+
+    @classmethod
+    def from_dict(cls, data, version=None):
+        """Build a catalog from a {telugu_name: entry} mapping"""
+        return cls((FoodRecord.from_dict(telugu, entry) for telugu, entry in data.items()), version=version)
+
+    def to_dict(self):
+        return {record.telugu: record.to_dict() for record in self.records}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.by_name)
+
+    def __contains__(self, telugu):
+        return telugu in self.by_name
+
+    def __getitem__(self, telugu):
+        return self.by_name[telugu]
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def file_version(path):
+    """Version tag for a catalog file; changes whenever the file is rewritten"""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def load_catalog(path=DEFAULT_CATALOG_PATH):
+    """Read a catalog file (JSON or snapshot) once per process and return the shared FoodCatalog"""
+    path = os.path.abspath(path)
+    version = file_version(path)
+    with _catalogs_lock:
+        catalog = _catalogs.get(path)
+        if catalog is None or catalog.version != version:
+            with open(path, 'rb') as f:
+                is_snapshot = f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+            if is_snapshot:
+                from snapshot import load_snapshot
+                catalog = load_snapshot(path, version=version)
+            else:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                catalog = FoodCatalog.from_dict(data, version=version)
+            _catalogs[path] = catalog
+            logger.info(f"Loaded {len(catalog)} foods from {path}")
+        return catalog
+
+
+class CatalogWatcher(threading.Thread):
+    """Daemon thread that polls a catalog file and calls on_change(path) after it is rewritten
+
+    A failing callback (e.g. a half-written file that does not parse yet) is logged and
+    retried on the next poll, since the version stays unacknowledged until it succeeds.
+    """
+
+    def __init__(self, path, on_change, interval=1.0, version=None):
+        super().__init__(name=f"CatalogWatcher({os.path.basename(path)})", daemon=True)
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.interval = interval
+        self.version = version if version is not None else file_version(self.path)
+        self._stopped = threading.Event()
+
+    def poll(self):
+        """Check the file once; returns True if a change was applied"""
+        try:
+            version = file_version(self.path)
+        except OSError:
+            return False  # mid-replace or deleted; keep serving the last good catalog
+        if version == self.version:
+            return False
+        try:
+            self.on_change(self.path)
+        except Exception:
+            logger.exception(f"Reloading {self.path} failed; keeping the current catalog")
+            return False
+        self.version = version
+        return True
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stopped.set()
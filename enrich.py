@@ -0,0 +1,233 @@
+"""Streaming enrichment of raw food name lists into the improved_food_data.csv format.
+
+    python enrich.py "Dataset/list(Sheet1) (1).csv" enriched.csv --workers 4
+    python enrich.py --check      # the bundled list still resolves every food the catalog has
+
+The input is read in chunks; each distinct name is resolved once through the
+processor's lookup, chunks are resolved on a process pool, and rows are appended
+to the output in input order. A checkpoint next to the output records how far
+the run got, so an interrupted run resumes where it stopped.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cache import LRUCache
+from catalog import file_version
+from search_index import normalize_query
+from trans import EnhancedFoodDataProcessor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dataset', 'list(Sheet1) (1).csv')
+OUTPUT_COLUMNS = ['Names', 'Telugu_Script', 'English_Name', 'Hindi_Name', 'Category', 'Retail_Display']
+UNMATCHED = ('', '', '', '', '')
+
+# Names in the bundled list whose food is in the bundled catalog, with the English name they must resolve to
+# ('Minappau', a misspelling of minapa pappu/Urad Dal, is too far from any name or key to resolve safely)
+BUNDLED_EXPECTED = {
+    'Samalu': 'Little Millet', 'Arikalu': 'Kodo Millet', 'Udhalu': 'Barnyard Millet',
+    'Andu korralu': 'Browntop Millet', 'Mysore pappu': 'Masoor Dal', 'Kinova': 'Quinoa', 'Jilukara': 'Cumin',
+    'Menthulu': 'Fenugreek', 'Jia Seeds': 'Chia Seeds', 'Kandhi Pappu': 'Toor Dal', 'Pesar Pappu': 'Moong Dal',
+    'Shaniga pappu': 'Chana Dal',
+}
+
+# Names in the bundled list whose food the bundled catalog lacks; any match for these is a wrong one
+BUNDLED_UNMATCHED = {
+    'Rajma', 'Kabun Shenigalu', 'Batani', 'Paspu', 'Nalla Popu ginjalu', 'Dhaniyalu', 'Soya been', 'Avalu',
+}
+
+# One processor per worker process
+_processor = None
+
+
+def _init_processor(catalog_path=None):
+    global _processor
+    if _processor is None:
+        _processor = EnhancedFoodDataProcessor(catalog_path) if catalog_path else EnhancedFoodDataProcessor()
+    return _processor
+
+
+def enriched_fields(info):
+    """Output columns (after Names) for the best match of a name"""
+    if not info:
+        return UNMATCHED
+    best = info[0]
+    return (best['telugu'], best['english'], best['hindi'], best['category'],
+            f"{best['english']} - {best['hindi']}")
+
+
+def resolve_names(keys, catalog_path=None):
+    """Map normalized names to their enriched fields; runs in a worker process"""
+    processor = _init_processor(catalog_path)
+    return {key: enriched_fields(info) for key, info in processor.iter_food_info_batch(keys)}
+
+
+def checkpoint_path(output_path):
+    return output_path + '.checkpoint'
+
+
+def read_checkpoint(input_path, output_path):
+    """Progress of an earlier run over the same input, or None to start afresh"""
+    path = checkpoint_path(output_path)
+    if not os.path.exists(path) or not os.path.exists(output_path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('input_version') != file_version(input_path):
+        logger.warning(f"{input_path} changed since the checkpoint was written; starting over")
+        return None
+    return checkpoint
+
+
+def write_checkpoint(output_path, checkpoint):
+    path = checkpoint_path(output_path)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(path + '.tmp', path)
+
+
+class Enricher:
+    """Resolves chunks of names, remembering recent answers so repeated names are looked up once"""
+
+    def __init__(self, workers=None, catalog_path=None, cache_size=100_000):
+        self.workers = workers
+        self.catalog_path = catalog_path
+        self.known = LRUCache(maxsize=cache_size)
+        self.executor = None
+        if workers:
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_processor,
+                                                initargs=(catalog_path,))
+
+    def submit(self, names):
+        """Start resolving a chunk's unseen names; returns (names, keys, known fields, pending lookup)"""
+        keys = [normalize_query(name) for name in names]
+        seen = {'': UNMATCHED}
+        unseen = []
+        for key in dict.fromkeys(keys):
+            if key not in seen:
+                fields = self.known.get(key)
+                if fields is None:
+                    unseen.append(key)
+                else:
+                    seen[key] = fields
+        if self.executor is not None:
+            return names, keys, seen, self.executor.submit(resolve_names, unseen, self.catalog_path)
+        return names, keys, seen, resolve_names(unseen, self.catalog_path)
+
+    def rows(self, submitted):
+        """Enriched rows of a submitted chunk, in input order"""
+        names, keys, seen, resolved = submitted
+        if hasattr(resolved, 'result'):
+            resolved = resolved.result()
+        for key, fields in resolved.items():
+            self.known.put(key, fields)
+        seen.update(resolved)
+        return [(name,) + seen[key] for name, key in zip(names, keys)]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def enrich_csv(input_path=DEFAULT_INPUT_PATH, output_path='improved_food_data.csv', chunk_size=50_000,
+               workers=None, catalog_path=None, resume=True):
+    """Enrich the Names column of input_path into output_path and return run statistics
+
+    Memory stays bounded by chunk_size and the number of chunks in flight (2 per worker),
+    whatever the input size. Progress is checkpointed after every appended chunk.
+    """
+    checkpoint = read_checkpoint(input_path, output_path) if resume else None
+    if checkpoint is None:
+        checkpoint = {"input_version": file_version(input_path), "rows": 0, "matched": 0, "output_bytes": 0}
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(f, index=False)
+        checkpoint["output_bytes"] = os.path.getsize(output_path)
+        write_checkpoint(output_path, checkpoint)
+    else:
+        # Drop rows appended after the last checkpoint, so they are not written twice
+        with open(output_path, 'r+b') as f:
+            f.truncate(checkpoint["output_bytes"])
+        logger.info(f"Resuming {input_path} after {checkpoint['rows']} rows")
+
+    done = checkpoint["rows"]
+    reader = pd.read_csv(input_path, usecols=['Names'], dtype=str, chunksize=chunk_size, keep_default_na=False,
+                         skiprows=lambda line: 0 < line <= done)
+    enricher = Enricher(workers=workers, catalog_path=catalog_path)
+    in_flight = max(1, 2 * (workers or 0))
+    pending = deque()
+
+    def flush():
+        rows = enricher.rows(pending.popleft())
+        frame = pd.DataFrame.from_records(rows, columns=OUTPUT_COLUMNS)
+        with open(output_path, 'a', encoding='utf-8', newline='') as f:
+            frame.to_csv(f, index=False, header=False)
+        checkpoint["rows"] += len(rows)
+        checkpoint["matched"] += int((frame['Telugu_Script'] != '').sum())
+        checkpoint["output_bytes"] = os.path.getsize(output_path)
+        write_checkpoint(output_path, checkpoint)
+        logger.info(f"Enriched {checkpoint['rows']} rows ({checkpoint['matched']} matched)")
+
+    try:
+        for chunk in reader:
+            names = [name.strip() for name in chunk['Names']]
+            pending.append(enricher.submit(names))
+            while len(pending) >= in_flight:
+                flush()
+        while pending:
+            flush()
+    finally:
+        enricher.close()
+
+    os.remove(checkpoint_path(output_path))
+    return {"rows": checkpoint["rows"], "matched": checkpoint["matched"],
+            "unmatched": checkpoint["rows"] - checkpoint["matched"]}
+
+
+def check_bundled(workers=0):
+    """Enrich the bundled name list and raise AssertionError unless every BUNDLED_EXPECTED name resolves
+    to its food and no BUNDLED_UNMATCHED name resolves at all"""
+    with tempfile.TemporaryDirectory() as directory:
+        output_path = os.path.join(directory, 'enriched.csv')
+        stats = enrich_csv(DEFAULT_INPUT_PATH, output_path, workers=workers, resume=False)
+        enriched = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    resolved = dict(zip(enriched['Names'], enriched['English_Name']))
+    wrong = {name: resolved.get(name, '') for name, english in BUNDLED_EXPECTED.items()
+             if resolved.get(name) != english}
+    spurious = {name: resolved[name] for name in BUNDLED_UNMATCHED if resolved.get(name)}
+    problems = [f"{name!r} -> {got or 'nothing'} (expected {BUNDLED_EXPECTED[name]})" for name, got in wrong.items()]
+    problems.extend(f"{name!r} -> {got} (not in the catalog)" for name, got in sorted(spurious.items()))
+    if problems:
+        raise AssertionError("Bundled names not resolved as expected: " + ', '.join(problems))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich a CSV of raw food names with scripts and categories")
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT_PATH, help="CSV with a Names column")
+    parser.add_argument('output', nargs='?', default='improved_food_data.csv')
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes (0 resolves in-process)")
+    parser.add_argument('--catalog', default=None, help="catalog JSON or snapshot (defaults to Dataset/food_database.json)")
+    parser.add_argument('--restart', action='store_true', help="ignore any checkpoint and start over")
+    parser.add_argument('--check', action='store_true',
+                        help="only verify that the bundled list resolves exactly the foods the bundled catalog has")
+    args = parser.parse_args()
+
+    if args.check:
+        print(json.dumps(check_bundled(args.workers), indent=2))
+        return
+
+    stats = enrich_csv(args.input, args.output, args.chunk_size, args.workers, args.catalog,
+                       resume=not args.restart)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from fuzzywuzzy import fuzz, utils
+
+
+class FuzzyMatcher:
+    """Fuzzy name matcher with a candidate table built once and an n-gram prefilter
+
+    Postings are bucketed by name length, so names too short or too long to beat the
+    threshold are never visited, and the prefilter walks the query's rarest n-grams
+    first, stopping once max_postings entries have been counted. Work per query is
+    bounded by those budgets rather than by the catalog size.
+    """
+
+    def __init__(self, threshold=70, limit=3, max_candidates=200, n=2, max_postings=5000):
+        self.threshold = threshold
+        self.limit = limit
+        self.max_candidates = max_candidates
+        self.max_postings = max_postings
+        self.n = n
+        self.names = []      # candidate id -> processed name
+        self.items = []      # candidate id -> item keys carrying that name
+        self.postings = {}   # n-gram -> {name length: candidate ids}
+        self._ids = {}
+
+    def _grams(self, text):
+        """Return the padded n-grams of an already processed string"""
+        padded = f" {text} "
+        return {padded[i:i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def add(self, name, item):
+        """Register a name for an item (each distinct name is scored only once)"""
+        processed = utils.full_process(name)
+        if not processed:
+            return
+        cid = self._ids.get(processed)
+        if cid is None:
+            cid = self._ids[processed] = len(self.names)
+            self.names.append(processed)
+            self.items.append([])
+            for gram in self._grams(processed):
+                self.postings.setdefault(gram, {}).setdefault(len(processed), []).append(cid)
+        if item not in self.items[cid]:
+            self.items[cid].append(item)
+
+    def _prefilter(self, query, threshold):
+        """Return candidate ids that share n-grams with query and can beat threshold"""
+        # fuzz.ratio can never exceed 200 * min(len) / (len_a + len_b), which bounds
+        # the candidate name lengths worth visiting
+        qlen = len(query)
+        lengths = range(int(qlen * threshold / (200 - threshold)), int(qlen * (200 - threshold) / threshold) + 2)
+        grams = []
+        for gram in self._grams(query):
+            buckets = self.postings.get(gram)
+            if buckets:
+                lists = [buckets[length] for length in lengths if length in buckets]
+                if lists:
+                    grams.append((sum(map(len, lists)), gram, lists))
+        grams.sort()
+
+        overlap = {}
+        walked = 0
+        for size, _, lists in grams:
+            if walked and walked + size > self.max_postings:
+                break
+            walked += size
+            for cids in lists:
+                for cid in cids:
+                    overlap[cid] = overlap.get(cid, 0) + 1
+
+        survivors = [
+            cid for cid in overlap
+            if 200 * min(qlen, len(self.names[cid])) / (qlen + len(self.names[cid])) > threshold
+        ]
+        if len(survivors) > self.max_candidates:
+            survivors.sort(key=lambda cid: (-overlap[cid], cid))
+            survivors = survivors[:self.max_candidates]
+        return survivors
+
+    def match(self, query, threshold=None, limit=None, metrics=None):
+        """Return item keys whose names score above threshold, best match first
+
+        metrics, when given, is told how many candidates were scored.
+        """
+        results = []
+        seen = set()
+        for _, _, items in self.scored(query, threshold, limit, metrics):
+            for item in items:
+                if item not in seen:
+                    seen.add(item)
+                    results.append(item)
+        return results
+
+    def scored(self, query, threshold=None, limit=None, metrics=None):
+        """Best (score, name, item keys) candidates above threshold, ordered by (-score, name)
+
+        Ties break on the name rather than on insertion order, so results from several
+        matchers over disjoint parts of a catalog can be merged exactly.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        query = utils.full_process(query)
+        if not query:
+            return []
+        survivors = self._prefilter(query, threshold)
+        if metrics is not None:
+            metrics.record_fuzzy_candidates(len(survivors))
+        return self._score(query, survivors, threshold, limit)
+
+    def candidates(self, query, threshold=None):
+        """Processed names the prefilter would score for query
+
+        Another matcher holding part of the same names can score them with score_names
+        and reproduce exactly what this matcher's scored() returns for its part.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        query = utils.full_process(query)
+        if not query:
+            return []
+        return [self.names[cid] for cid in self._prefilter(query, threshold)]
+
+    def score_names(self, query, names, threshold=None, limit=None):
+        """scored() over just the given processed names, skipping those this matcher lacks"""
+        threshold = self.threshold if threshold is None else threshold
+        query = utils.full_process(query)
+        if not query:
+            return []
+        return self._score(query, [self._ids[name] for name in names if name in self._ids], threshold, limit)
+
+    def _score(self, query, cids, threshold, limit):
+        limit = self.limit if limit is None else limit
+        scored = []
+        for cid in cids:
+            score = fuzz.ratio(query, self.names[cid])
+            if score > threshold:
+                scored.append((score, self.names[cid], self.items[cid]))
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        return scored[:limit]
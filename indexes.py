@@ -0,0 +1,192 @@
+import numpy as np
+
+from benefits import BenefitIndex
+from browse import FacetIndex
+from fuzzy_match import FuzzyMatcher
+from meal_planner import MealPlanner
+from nutrients import NutrientIndex, NutrientMatrix, NutrientSpace
+from search_index import NGramIndex, PrefixIndex, normalize_query
+from transliterate import key_skeleton, phonetic_key
+
+# Index groups and the record fields each one is built from
+INDEX_GROUPS = {
+    'names': ('english', 'hindi', 'tamil', 'kannada'),
+    'nutrients': ('nutrients',),
+    'filters': ('category', 'type', 'benefits'),
+    'planner': ('english', 'category', 'benefits'),
+}
+
+
+def changed_groups(old_catalog, new_catalog):
+    """Index groups whose inputs differ between two catalogs (all of them if the food list changed)"""
+    if [r.telugu for r in old_catalog.records] != [r.telugu for r in new_catalog.records]:
+        return set(INDEX_GROUPS)
+    groups = set()
+    for old, new in zip(old_catalog.records, new_catalog.records):
+        if old is new:
+            continue
+        for group, fields in INDEX_GROUPS.items():
+            if group not in groups and any(getattr(old, f) != getattr(new, f) for f in fields):
+                groups.add(group)
+    # The planner reads the nutrient matrix
+    if 'nutrients' in groups:
+        groups.add('planner')
+    return groups
+
+
+class CatalogIndexes:
+    """Every structure derived from one catalog, built once and never mutated afterwards
+
+    The processor reads one of these per call and replaces it wholesale on reload, so a
+    call never mixes indexes from two catalog versions. Given the previous instance,
+    groups whose inputs did not change are reused instead of rebuilt.
+    """
+
+    def __init__(self, catalog, phonetic_mappings, previous=None):
+        self.catalog = catalog
+        self.food_database = catalog.by_name
+        self.food_keys = list(self.food_database)
+        self.phonetic_mappings = phonetic_mappings
+
+        groups = set(INDEX_GROUPS) if previous is None else changed_groups(previous.catalog, catalog)
+        self.rebuilt = tuple(group for group in INDEX_GROUPS if group in groups)
+        if 'names' in groups:
+            self._build_search_indexes()
+        else:
+            for name in ('name_index', 'phonetic_keys', 'phonetic_index', 'phonetic_key_index', 'fuzzy_matcher', 'key_matcher',
+                         'prefix_index', 'phonetic_prefix_index'):
+                setattr(self, name, getattr(previous, name))
+
+        if 'nutrients' in groups:
+            self.nutrient_matrix = NutrientMatrix(catalog)
+            self.nutrient_index = NutrientIndex(self.nutrient_matrix)
+            self.nutrient_space = NutrientSpace(self.nutrient_matrix)
+        else:
+            self.nutrient_matrix = previous.nutrient_matrix
+            self.nutrient_index = previous.nutrient_index
+            self.nutrient_space = previous.nutrient_space
+
+        if 'filters' in groups:
+            self._build_filter_masks()
+        else:
+            self.category_masks = previous.category_masks
+            self.type_masks = previous.type_masks
+            self.benefit_index = previous.benefit_index
+            self.facets = previous.facets
+
+        if 'planner' in groups:
+            self.meal_planner = MealPlanner(self.nutrient_matrix, self.food_database)
+        else:
+            self.meal_planner = previous.meal_planner
+
+    def _build_search_indexes(self):
+        """Build n-gram indexes over every name field once, at load time"""
+        self.name_index = NGramIndex()
+        for telugu_name, data in self.food_database.items():
+            self.name_index.add([
+                normalize_query(telugu_name),
+                normalize_query(data['english']),
+                normalize_query(data['hindi']),
+                normalize_query(data.get('tamil', '')),
+                normalize_query(data.get('kannada', ''))
+            ])
+        self.name_index.freeze()
+
+        self.phonetic_keys = list(self.phonetic_mappings)
+        self.phonetic_index = NGramIndex()
+        for phonetic in self.phonetic_keys:
+            self.phonetic_index.add([normalize_query(phonetic)])
+        self.phonetic_index.freeze()
+
+        # Canonical phonetic keys, so any spelling variant is one dict lookup
+        self.phonetic_key_index = {}
+        spellings = [
+            (name, telugu_name)
+            for telugu_name, data in self.food_database.items()
+            for name in (telugu_name, data['english'], data['hindi'],
+                         data.get('tamil', ''), data.get('kannada', ''))
+        ]
+        spellings.extend((phonetic, telugu) for phonetic, telugu in self.phonetic_mappings.items())
+        phonetic_entries = []
+        for name, telugu_name in spellings:
+            key = phonetic_key(name)
+            if key and telugu_name in self.food_database:
+                items = self.phonetic_key_index.setdefault(key, [])
+                if telugu_name not in items:
+                    items.append(telugu_name)
+                phonetic_entries.append((key, telugu_name, name))
+        self._build_prefix_indexes(phonetic_entries)
+
+        # Fuzzy candidates: English, Telugu and Hindi names of every item
+        self.fuzzy_matcher = FuzzyMatcher(threshold=70, limit=3)
+        for telugu_name, data in self.food_database.items():
+            for name in (data['english'].lower(), telugu_name, data['hindi']):
+                self.fuzzy_matcher.add(name, telugu_name)
+
+        # Phonetic keys as strict fuzzy candidates too, so a near-miss key ('kinov' for 'kvinov')
+        # resolves; items in catalog order, as key_matches caps them
+        self.key_matcher = FuzzyMatcher(threshold=89, limit=3)
+        row_of = {telugu_name: row for row, telugu_name in enumerate(self.food_keys)}
+        for key, telugu_names in self.phonetic_key_index.items():
+            for telugu_name in sorted(telugu_names, key=row_of.__getitem__):
+                self.key_matcher.add(key, telugu_name)
+
+    def key_matches(self, query, metrics=None, candidates=None):
+        """(score, key, items) of catalog keys scoring at least 90 against the query's phonetic
+        key and sharing its consonant skeleton, best first
+
+        Callers take at most key_matcher.limit items from these, in order. candidates,
+        if given, are the keys to score instead of those key_matcher's prefilter picks.
+        """
+        key = phonetic_key(query)
+        if not key:
+            return []
+        skeleton = key_skeleton(key)
+        matcher = self.key_matcher
+        if candidates is None:
+            scored = matcher.scored(key, limit=matcher.max_candidates, metrics=metrics)
+        else:
+            scored = matcher.score_names(key, candidates, limit=matcher.max_candidates)
+        return [match for match in scored if key_skeleton(match[1]) == skeleton][:matcher.limit]
+
+    def _build_prefix_indexes(self, phonetic_entries):
+        """Sorted prefix indexes over every name variant for autocomplete"""
+        row_of = {telugu_name: row for row, telugu_name in enumerate(self.food_keys)}
+
+        def rank(kind, key, telugu_name):
+            # Lower is better: match kind, then shorter names, then catalog order
+            return kind << 40 | min(len(key), 0xFFFF) << 24 | row_of[telugu_name]
+
+        entries = []
+        for telugu_name, data in self.food_database.items():
+            for kind, name in ((0, data['english']), (0, telugu_name), (1, data['hindi']),
+                               (1, data.get('tamil', '')), (1, data.get('kannada', ''))):
+                key = normalize_query(name)
+                if not key:
+                    continue
+                entries.append((key, rank(kind, key, telugu_name), telugu_name, name))
+                # Later words too, so 'mil' completes 'Foxtail Millet'
+                for i, char in enumerate(key):
+                    if char == ' ':
+                        entries.append((key[i + 1:], rank(3, key, telugu_name), telugu_name, name))
+        for phonetic, telugu_name in self.phonetic_mappings.items():
+            if telugu_name in self.food_database:
+                key = normalize_query(phonetic)
+                entries.append((key, rank(2, key, telugu_name), telugu_name, phonetic))
+        self.prefix_index = PrefixIndex(entries)
+        self.phonetic_prefix_index = PrefixIndex(
+            (key, rank(2, key, telugu_name), telugu_name, name) for key, telugu_name, name in phonetic_entries
+        )
+
+    def _build_filter_masks(self):
+        """Category/type row masks for query_foods, benefit bitsets for boolean queries and browse facets"""
+        self.category_masks = {}
+        self.type_masks = {}
+        size = len(self.food_keys)
+        for row, telugu_name in enumerate(self.food_keys):
+            data = self.food_database[telugu_name]
+            for masks, value in ((self.category_masks, data['category']), (self.type_masks, data['type'])):
+                if value:
+                    masks.setdefault(value.lower(), np.zeros(size, dtype=bool))[row] = True
+        self.benefit_index = BenefitIndex(self.catalog)
+        self.facets = FacetIndex(self.benefit_index)
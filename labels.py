@@ -0,0 +1,141 @@
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+LABEL_WIDTH = 62  # columns between the box borders
+
+# Virama of every Indic block from Devanagari (U+094D) to Malayalam (U+0D4D)
+INDIC_VIRAMAS = {chr(base + 0x4D) for base in range(0x0900, 0x0D00, 0x80)}
+ZWJ = '\u200d'
+JOINERS = {'\u200c', ZWJ}  # ZWNJ breaks a conjunct, ZWJ forces one
+
+
+def graphemes(text):
+    """Split text into user-perceived characters (base + marks, with Indic conjuncts kept whole)"""
+    clusters = []
+    for char in text:
+        if clusters and (
+            unicodedata.category(char) in ('Mn', 'Mc', 'Me')
+            or char in JOINERS
+            or (clusters[-1][-1] in INDIC_VIRAMAS and unicodedata.category(char) == 'Lo')
+            or clusters[-1][-1] == ZWJ
+        ):
+            clusters[-1] += char
+        else:
+            clusters.append(char)
+    return clusters
+
+
+def _cluster_width(cluster):
+    base = cluster[0]
+    if unicodedata.category(base) in ('Cc', 'Cf'):
+        return 0
+    return 2 if unicodedata.east_asian_width(base) in ('W', 'F') else 1
+
+
+def display_width(text):
+    """Number of terminal columns a string occupies"""
+    return sum(_cluster_width(cluster) for cluster in graphemes(text))
+
+
+def fit(text, width, align='<'):
+    """Truncate (with an ellipsis) and pad text to exactly width display columns"""
+    text = str(text)
+    clusters = graphemes(text)
+    used = sum(_cluster_width(cluster) for cluster in clusters)
+    if used > width:
+        kept, used = [], 0
+        for cluster in clusters:
+            cw = _cluster_width(cluster)
+            if used + cw > width - 1:
+                break
+            kept.append(cluster)
+            used += cw
+        text = ''.join(kept) + '…'
+        used += 1
+    gap = width - used
+    if align == '^':
+        return ' ' * (gap // 2) + text + ' ' * (gap - gap // 2)
+    if align == '>':
+        return ' ' * gap + text
+    return text + ' ' * gap
+
+
+class LabelTemplate:
+    """Retail label layout compiled once: static rows are prebuilt, dynamic rows are padded by display width"""
+
+    def __init__(self, width=LABEL_WIDTH, benefits=3):
+        self.width = width
+        self.content = width - 4
+        self.benefits = benefits
+        self.top = '╔' + '═' * width + '╗'
+        self.bottom = '╚' + '═' * width + '╝'
+        self.blank = '║' + ' ' * width + '║'
+        self.benefits_title = self._row('Key Benefits:')
+        self.nutrition_title = self._row('Nutrition Highlights (per 100g):')
+
+    def _row(self, text, align='<'):
+        return f"║  {fit(text, self.content, align)}  ║"
+
+    def render(self, telugu_name, english, hindi, category, food_type, benefits, protein, fiber):
+        rows = [
+            '',
+            self.top,
+            self._row(english, '^'),
+            self._row(telugu_name, '^'),
+            self._row(hindi, '^'),
+            self.blank,
+            self._row(f"Category: {fit(category, 15)} Type: {fit(food_type, 20)}"),
+            self.blank,
+            self.benefits_title,
+        ]
+        rows.extend(self._row(f"{i}. {benefit}") for i, benefit in enumerate(benefits[:self.benefits], 1))
+        rows.extend([
+            self.blank,
+            self.nutrition_title,
+            self._row(f"Protein: {fit(protein, 10)} Fiber: {fit(fiber, 15)}"),
+            self.bottom,
+            ''
+        ])
+        return '\n'.join(rows)
+
+
+DEFAULT_TEMPLATE = LabelTemplate()
+
+
+def label_fields(telugu_name, data):
+    """The plain, picklable values a label needs from a catalog record"""
+    nutrition = data['nutrition']
+    return (telugu_name, data['english'], data['hindi'], data['category'], data['type'],
+            tuple(data['benefits']), nutrition.get('protein', 'N/A'), nutrition.get('fiber', 'N/A'))
+
+
+def _render_chunk(chunk):
+    return [DEFAULT_TEMPLATE.render(*fields) for fields in chunk]
+
+
+def render_labels(fields_iter, workers=None, chunk_size=256):
+    """Yield rendered labels in order; with workers, chunks render on a process pool
+
+    At most 2 * workers chunks are in flight, so memory stays flat however many labels
+    are produced.
+    """
+    if not workers:
+        for fields in fields_iter:
+            yield DEFAULT_TEMPLATE.render(*fields)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        chunk = []
+        for fields in fields_iter:
+            chunk.append(fields)
+            if len(chunk) == chunk_size:
+                pending.append(executor.submit(_render_chunk, chunk))
+                chunk = []
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(executor.submit(_render_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
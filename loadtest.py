@@ -0,0 +1,127 @@
+"""Load generator for server.py: measures QPS and latency percentiles over keep-alive connections.
+
+    python server.py --port 8080 &
+    python loadtest.py --port 8080 --connections 32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+
+from catalog import load_catalog
+
+
+def build_request_mix(catalog, seed=0):
+    """Realistic mix: exact names, substrings, misspellings, other scripts, browse, compare, meals"""
+    rng = random.Random(seed)
+    records = list(catalog.records)
+    names = [r.english for r in records] + [r.hindi for r in records if r.hindi] + [r.telugu for r in records]
+
+    def misspell(name):
+        chars = list(name.lower())
+        if len(chars) > 3:
+            i = rng.randrange(len(chars))
+            chars[i] = rng.choice('aeiou')
+        return ''.join(chars)
+
+    mix = []
+    for _ in range(500):
+        kind = rng.random()
+        name = rng.choice(names)
+        if kind < 0.45:
+            mix.append(('GET', f"/search?q={quote(name)}", None))
+        elif kind < 0.60:
+            mix.append(('GET', f"/search?q={quote(name[:max(3, len(name) // 2)])}", None))
+        elif kind < 0.75:
+            mix.append(('GET', f"/search?q={quote(misspell(name))}", None))
+        elif kind < 0.82:
+            mix.append(('GET', f"/category/{quote(rng.choice(records).category)}", None))
+        elif kind < 0.90:
+            foods = [r.english for r in rng.sample(records, 3)]
+            mix.append(('POST', "/compare", {"foods": foods}))
+        elif kind < 0.95:
+            mix.append(('GET', f"/meals?preference={rng.choice(['balanced', 'diabetic', 'weight_loss'])}", None))
+        else:
+            mix.append(('POST', "/labels", {"foods": [r.english for r in rng.sample(records, 2)]}))
+    return mix
+
+
+async def _send(reader, writer, host, method, path, body):
+    data = b'' if body is None else json.dumps(body).encode('utf-8')
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data
+    )
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def _worker(host, port, mix, deadline, latencies, errors, offset):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body = mix[i % len(mix)]
+            i += 1
+            start = time.perf_counter()
+            status = await _send(reader, writer, host, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(host, port, connections, duration, seed=0):
+    mix = build_request_mix(load_catalog(), seed)
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _worker(host, port, mix, deadline, latencies, errors, offset=i * 17) for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "qps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the food API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.host, args.port, args.connections, args.duration, args.seed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import numpy as np
+
+from nutrients import UNIT_SCALES
+
+# Daily targets per nutrient as (amount, unit); converted to the nutrient matrix units
+DAILY_TARGETS = {
+    'protein': (55.0, 'g'), 'fiber': (30.0, 'g'), 'iron': (19.0, 'mg'), 'calcium': (1000.0, 'mg'),
+    'magnesium': (340.0, 'mg'), 'zinc': (12.0, 'mg'), 'folate': (300.0, 'mcg')
+}
+
+# Meal slots: share of the daily targets, categories served, item count and portion bounds (g)
+MEAL_SLOTS = {
+    'breakfast': {'share': 0.25, 'categories': ('Millet', 'Grain'), 'items': 2, 'portion': (30, 80)},
+    'lunch': {'share': 0.35, 'categories': ('Millet', 'Grain', 'Pulse'), 'items': 3, 'portion': (30, 100)},
+    'dinner': {'share': 0.30, 'categories': ('Millet', 'Pulse'), 'items': 2, 'portion': (30, 80)},
+    'snacks': {'share': 0.10, 'categories': ('Seeds', 'Spice'), 'items': 1, 'portion': (5, 20)},
+}
+
+DIETARY_PROFILES = {
+    'balanced': {
+        'weights': {},
+        'benefit_keywords': ('energy', 'digest'),
+        'portion_scale': 1.0,
+    },
+    'diabetic': {
+        'weights': {'fiber': 2.0, 'protein': 1.5, 'magnesium': 1.5},
+        'benefit_keywords': ('blood sugar', 'diabet', 'glycemic'),
+        'portion_scale': 0.9,
+    },
+    'weight_loss': {
+        'weights': {'fiber': 2.0, 'protein': 1.5},
+        'benefit_keywords': ('weight', 'digest', 'cholesterol'),
+        'portion_scale': 0.8,
+    },
+}
+
+BENEFIT_BONUS = 0.25
+MIN_GAIN = 1e-3
+# Upper bound on profiles x foods x nutrients floats held at once in batch mode
+BATCH_BUDGET = 4_000_000
+
+
+def normalize_preference(preference):
+    """Map free-form preferences ('Weight Loss', 'weight-loss') onto a profile name"""
+    key = str(preference or 'balanced').strip().lower().replace('-', '_').replace(' ', '_')
+    return key if key in DIETARY_PROFILES else 'balanced'
+
+
+class MealPlanner:
+    """Greedy-with-bounds meal planner over the numeric nutrient matrix, vectorized across profiles"""
+
+    def __init__(self, matrix, food_database):
+        self.matrix = matrix
+        self.nutrients = [n for n in DAILY_TARGETS if n in matrix.column_of]
+        self.targets = {}  # nutrient -> daily target in the matrix unit
+        for nutrient in self.nutrients:
+            amount, unit = DAILY_TARGETS[nutrient]
+            self.targets[nutrient] = amount * UNIT_SCALES[unit] / UNIT_SCALES[matrix.unit(nutrient)]
+        cols = [matrix.column_of[n] for n in self.nutrients]
+
+        # Only foods with at least one known target nutrient can be planned
+        known = matrix.mask[:, cols]
+        self.rows = np.flatnonzero(known.any(axis=1))
+        self.food_keys = [matrix.food_keys[row] for row in self.rows]
+        self.amounts = np.where(known, matrix.values[:, cols], 0.0)[self.rows] / 100.0  # per gram
+
+        records = [food_database[key] for key in self.food_keys]
+        # Catalog aliases of one food (same English name) count as one pick
+        group_of = {}
+        self.groups = np.array([group_of.setdefault(record['english'].lower(), len(group_of))
+                                for record in records], dtype=np.intp)
+        self.group_count = len(group_of)
+        categories = np.array([record['category'] for record in records], dtype=object)
+        self.slot_allowed = {
+            slot: np.isin(categories, spec['categories']) for slot, spec in MEAL_SLOTS.items()
+        }
+        benefits = [' '.join(record['benefits']).lower() for record in records]
+        self.profile_names = list(DIETARY_PROFILES)
+        self.profile_bonus = np.array([
+            [BENEFIT_BONUS if any(word in text for word in spec['benefit_keywords']) else 0.0
+             for text in benefits]
+            for spec in DIETARY_PROFILES.values()
+        ]).reshape(len(DIETARY_PROFILES), len(self.food_keys))
+
+    def _profile_arrays(self, profiles):
+        """Targets, weights, base-profile index and portion scale for each profile"""
+        targets = np.empty((len(profiles), len(self.nutrients)))
+        weights = np.ones_like(targets)
+        base = np.empty(len(profiles), dtype=np.intp)
+        scale = np.empty(len(profiles))
+        for i, profile in enumerate(profiles):
+            if not isinstance(profile, dict):
+                profile = {'preference': profile}
+            name = normalize_preference(profile.get('preference'))
+            spec = DIETARY_PROFILES[name]
+            overrides = profile.get('targets', {})
+            for j, nutrient in enumerate(self.nutrients):
+                targets[i, j] = overrides.get(nutrient, self.targets[nutrient])
+                weights[i, j] = spec['weights'].get(nutrient, 1.0)
+            base[i] = self.profile_names.index(name)
+            scale[i] = spec['portion_scale']
+        return targets, weights, base, scale
+
+    def _plan_chunk(self, targets, weights, base, scale):
+        """Run the greedy planner for a chunk of profiles at once"""
+        count = len(targets)
+        amounts = self.amounts[None, :, :]
+        bonus = 1.0 + self.profile_bonus[base]
+        used = np.zeros((count, self.group_count), dtype=bool)
+        picks = {slot: [] for slot in MEAL_SLOTS}
+        day_total = np.zeros_like(targets)
+        everyone = np.arange(count)
+
+        for slot, spec in MEAL_SLOTS.items():
+            target = np.maximum(targets * spec['share'], 1e-9)
+            total = np.zeros_like(targets)
+            low = spec['portion'][0] * scale[:, None]
+            high = spec['portion'][1] * scale[:, None]
+            blocked = ~self.slot_allowed[slot][None, :]
+            for _ in range(spec['items']):
+                remaining = np.maximum(target - total, 0.0)
+                # Largest portion that does not overshoot any still-unmet nutrient
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = np.where(
+                        (amounts > 0) & (remaining[:, None, :] > 0),
+                        remaining[:, None, :] / amounts, np.inf
+                    )
+                portion = ratio.min(axis=2)
+                portion = np.where(np.isfinite(portion), portion, high)
+                portion = np.round(np.clip(portion, low, high) / 5.0) * 5.0
+
+                current = np.minimum(total, target)[:, None, :]
+                reached = np.minimum(total[:, None, :] + amounts * portion[:, :, None], target[:, None, :])
+                gain = (weights[:, None, :] * (reached - current) / target[:, None, :]).sum(axis=2)
+                score = np.where(used[:, self.groups] | blocked, -np.inf, gain * bonus)
+
+                best = score.argmax(axis=1)
+                ok = score[everyone, best] > MIN_GAIN
+                grams = portion[everyone, best]
+                added = self.amounts[best] * grams[:, None] * ok[:, None]
+                total += added
+                used[everyone[ok], self.groups[best[ok]]] = True
+                picks[slot].append((best, grams, ok))
+            day_total += total
+        return picks, day_total
+
+    def plan_batch(self, profiles):
+        """Plan a day of meals for many profiles in one call (dicts or preference strings)
+
+        A profile dict may override targets, given in the nutrient matrix units.
+        """
+        if not profiles:
+            return []
+        if not self.nutrients:
+            raise ValueError(f"The catalog has none of the planner's target nutrients ({', '.join(DAILY_TARGETS)})")
+        targets, weights, base, scale = self._profile_arrays(profiles)
+        chunk = max(1, BATCH_BUDGET // max(1, len(self.food_keys) * len(self.nutrients)))
+
+        plans = []
+        for start in range(0, len(profiles), chunk):
+            stop = start + chunk
+            picks, day_total = self._plan_chunk(targets[start:stop], weights[start:stop],
+                                                base[start:stop], scale[start:stop])
+            for i in range(len(day_total)):
+                meals = {slot: [] for slot in MEAL_SLOTS}
+                for slot, steps in picks.items():
+                    for best, grams, ok in steps:
+                        if ok[i]:
+                            meals[slot].append((self.food_keys[best[i]], float(grams[i])))
+                plans.append({
+                    "preference": self.profile_names[base[start + i]],
+                    "meals": meals,
+                    "totals": {n: round(float(v), 2) for n, v in zip(self.nutrients, day_total[i])},
+                    "targets": {n: float(v) for n, v in zip(self.nutrients, targets[start + i])}
+                })
+        return plans
+
+    def plan(self, profile='balanced'):
+        """Plan a day of meals for a single profile"""
+        return self.plan_batch([profile])[0]
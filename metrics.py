@@ -0,0 +1,146 @@
+import bisect
+import threading
+
+# Upper bounds in seconds: 10µs doubling up to ~2.6s, then +Inf
+LATENCY_BUCKETS = tuple(1e-5 * 2 ** i for i in range(19))
+# 'sharded' is one scatter-gather round trip; the shards' own stages are not broken out
+SEARCH_STAGES = ('direct', 'phonetic', 'fuzzy', 'sharded')
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative on export, like Prometheus)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None if empty or beyond the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs ending with ('+Inf', count)"""
+        pairs, seen = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            pairs.append((f"{bound:g}", seen))
+        pairs.append(('+Inf', self.count))
+        return pairs
+
+
+class SearchMetrics:
+    """Thread-safe per-stage timings and counters for the search pipeline"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {stage: Histogram() for stage in SEARCH_STAGES}
+            self.total = Histogram()
+            self.stage_hits = dict.fromkeys(SEARCH_STAGES, 0)
+            self.stage_results = dict.fromkeys(SEARCH_STAGES, 0)
+            self.searches = 0
+            self.cached_searches = 0
+            self.empty_searches = 0
+            self.results_returned = 0
+            self.fuzzy_candidates_scored = 0
+
+    def record_stage(self, stage, seconds, found):
+        """One run of a stage that added found new results"""
+        with self._lock:
+            self.stages[stage].observe(seconds)
+            if found:
+                self.stage_hits[stage] += 1
+                self.stage_results[stage] += found
+
+    def record_fuzzy_candidates(self, scored):
+        with self._lock:
+            self.fuzzy_candidates_scored += scored
+
+    def record_search(self, seconds, results, cached):
+        with self._lock:
+            self.total.observe(seconds)
+            self.searches += 1
+            self.cached_searches += cached
+            self.empty_searches += not results
+            self.results_returned += results
+
+    def stats(self):
+        """Counters plus count/mean/p50/p99 (ms) per stage"""
+        def summary(histogram):
+            to_ms = lambda seconds: None if seconds is None else round(seconds * 1000, 4)
+            return {
+                "count": histogram.count,
+                "mean_ms": to_ms(histogram.sum / histogram.count) if histogram.count else None,
+                "p50_ms": to_ms(histogram.quantile(0.5)),
+                "p99_ms": to_ms(histogram.quantile(0.99))
+            }
+
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "cached_searches": self.cached_searches,
+                "empty_searches": self.empty_searches,
+                "results_returned": self.results_returned,
+                "fuzzy_candidates_scored": self.fuzzy_candidates_scored,
+                "total": summary(self.total),
+                "stages": {
+                    stage: dict(summary(self.stages[stage]), hits=self.stage_hits[stage],
+                                results=self.stage_results[stage])
+                    for stage in SEARCH_STAGES
+                }
+            }
+
+    def prometheus(self, prefix='milletmitra_search'):
+        """Prometheus text exposition of every counter and histogram"""
+        lines = []
+
+        def counter(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{labels} {value}")
+
+        def histogram(name, help_text, histograms):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for labels, h in histograms:
+                for bound, count in h.cumulative():
+                    bucket_labels = f'{labels},le="{bound}"' if labels else f'le="{bound}"'
+                    lines.append(f"{prefix}_{name}_bucket{{{bucket_labels}}} {count}")
+                braces = f"{{{labels}}}" if labels else ''
+                lines.append(f"{prefix}_{name}_sum{braces} {h.sum:.9f}")
+                lines.append(f"{prefix}_{name}_count{braces} {h.count}")
+
+        with self._lock:
+            counter('requests_total', "Searches served, including cache hits", [('', self.searches)])
+            counter('cached_total', "Searches answered from the result cache", [('', self.cached_searches)])
+            counter('empty_total', "Searches that returned no results", [('', self.empty_searches)])
+            counter('results_total', "Results returned across all searches", [('', self.results_returned)])
+            counter('fuzzy_candidates_scored_total', "Names scored by the fuzzy fallback",
+                    [('', self.fuzzy_candidates_scored)])
+            counter('stage_hits_total', "Stage runs that found at least one new result",
+                    [(f'{{stage="{stage}"}}', self.stage_hits[stage]) for stage in SEARCH_STAGES])
+            counter('stage_results_total', "Results contributed by each stage",
+                    [(f'{{stage="{stage}"}}', self.stage_results[stage]) for stage in SEARCH_STAGES])
+            histogram('seconds', "End-to-end search latency", [('', self.total)])
+            histogram('stage_seconds', "Latency of each search stage",
+                      [(f'stage="{stage}"', self.stages[stage]) for stage in SEARCH_STAGES])
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,255 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Mass units relative to grams
+UNIT_SCALES = {'kg': 1e3, 'g': 1.0, 'mg': 1e-3, 'mcg': 1e-6, 'µg': 1e-6, 'μg': 1e-6, 'ug': 1e-6}
+
+
+class NutrientMatrix:
+    """Foods x nutrients matrix of amounts per 100g, normalized to one unit per nutrient"""
+
+    def __init__(self, catalog):
+        self.food_keys = [record.telugu for record in catalog.records]
+        self.row_of = {telugu: row for row, telugu in enumerate(self.food_keys)}
+        if catalog.nutrient_columns is not None:
+            self.nutrients, self.units, self.values, self.mask = catalog.nutrient_columns
+            self.column_of = {name: col for col, name in enumerate(self.nutrients)}
+        else:
+            self._build(catalog)
+
+        self.column_max = np.where(self.mask, self.values, -np.inf).max(axis=0, initial=-np.inf)
+        self.column_max[~np.isfinite(self.column_max)] = np.nan
+
+    def _build(self, catalog):
+        # Column order follows first appearance; each nutrient keeps its most common unit
+        unit_counts = {}
+        for record in catalog.records:
+            for name, _, value, unit in record.nutrients:
+                if value is not None and unit in UNIT_SCALES:
+                    counts = unit_counts.setdefault(name, {})
+                    counts[unit] = counts.get(unit, 0) + 1
+        self.nutrients = list(unit_counts)
+        self.column_of = {name: col for col, name in enumerate(self.nutrients)}
+        self.units = [max(counts, key=counts.get) for counts in unit_counts.values()]
+
+        self.values = np.zeros((len(self.food_keys), len(self.nutrients)), dtype=np.float64)
+        self.mask = np.zeros(self.values.shape, dtype=bool)  # True where a value is known
+        for row, record in enumerate(catalog.records):
+            for name, _, value, unit in record.nutrients:
+                col = self.column_of.get(name)
+                if col is None or value is None or unit not in UNIT_SCALES:
+                    continue
+                self.values[row, col] = value * UNIT_SCALES[unit] / UNIT_SCALES[self.units[col]]
+                self.mask[row, col] = True
+
+    def column(self, nutrient):
+        """Return the column index of a nutrient, raising KeyError if unknown"""
+        try:
+            return self.column_of[nutrient.lower()]
+        except KeyError:
+            raise KeyError(f"Unknown nutrient: {nutrient}") from None
+
+    def unit(self, nutrient):
+        return self.units[self.column(nutrient)]
+
+    def rows(self, food_keys):
+        """Map Telugu keys to matrix rows"""
+        return np.array([self.row_of[key] for key in food_keys], dtype=np.intp)
+
+    def filled(self, rows=None, fill=np.nan):
+        """Return values (optionally for a subset of rows) with missing entries set to fill"""
+        values = self.values if rows is None else self.values[rows]
+        mask = self.mask if rows is None else self.mask[rows]
+        return np.where(mask, values, fill)
+
+    def rank(self, nutrient, descending=True, rows=None):
+        """Return row indices ordered by a nutrient; foods without a value are left out"""
+        col = self.column(nutrient)
+        candidates = np.arange(len(self.food_keys)) if rows is None else np.asarray(rows, dtype=np.intp)
+        candidates = candidates[self.mask[candidates, col]]
+        values = self.values[candidates, col]
+        # Stable sort keeps catalog order among ties
+        order = np.argsort(-values if descending else values, kind='stable')
+        return candidates[order]
+
+    def percent_of_max(self, rows=None):
+        """Each value as a percentage of the catalog-wide maximum of its nutrient"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.filled(rows) / self.column_max * 100.0
+
+    def difference_from(self, reference_row, rows=None):
+        """Per-nutrient difference of every (or selected) food against a reference food"""
+        reference = self.filled([reference_row])[0]
+        return self.filled(rows) - reference
+
+
+class NutrientIndex:
+    """Per-nutrient sorted indexes answering range and top-k queries by binary search"""
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self.sorted_rows = []    # per nutrient: rows with a known value, ascending by value
+        self.sorted_values = []
+        for col in range(len(matrix.nutrients)):
+            rows = np.flatnonzero(matrix.mask[:, col])
+            order = np.argsort(matrix.values[rows, col], kind='stable')
+            self.sorted_rows.append(rows[order])
+            self.sorted_values.append(matrix.values[rows[order], col])
+
+    def range(self, nutrient, low=None, high=None):
+        """Rows whose value lies in [low, high] (either end may be None), ascending by value"""
+        col = self.matrix.column(nutrient)
+        values = self.sorted_values[col]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return self.sorted_rows[col][start:stop]
+
+    def top_k(self, nutrient, k, descending=True, allowed=None):
+        """The k rows with the highest (or lowest) value, optionally restricted to an allowed-row mask"""
+        col = self.matrix.column(nutrient)
+        rows = self.sorted_rows[col]
+        if descending:
+            rows = rows[::-1]
+        if allowed is None:
+            return rows[:k]
+
+        # Walk the sorted order in growing chunks until k allowed rows are found
+        found = []
+        start, chunk = 0, max(k * 4, 64)
+        while start < len(rows) and len(found) < k:
+            block = rows[start:start + chunk]
+            found.extend(block[allowed[block]][:k - len(found)])
+            start += chunk
+            chunk *= 2
+        return np.array(found, dtype=np.intp)
+
+
+class NutrientSpace:
+    """Normalized nutrient vectors for nearest-neighbour substitute lookups
+
+    Values are log-scaled (nutrient amounts are heavily skewed) and standardized per
+    nutrient; a missing value sits at the nutrient's mean, so it neither attracts nor
+    repels. Distances are Euclidean, computed for all rows at once from
+    |x|^2 - 2 x.q + |q|^2, so a lookup is one matrix-vector product.
+    """
+
+    # Upper bound on the elements of the query-block x catalog distance matrices in flight
+    MAX_BLOCK = 1 << 22
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        logged = np.log1p(np.where(matrix.mask, np.maximum(matrix.values, 0.0), 0.0))
+        counts = matrix.mask.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(matrix.mask, logged, 0.0).sum(axis=0) / counts
+            var = np.where(matrix.mask, (logged - mean) ** 2, 0.0).sum(axis=0) / counts
+        std = np.sqrt(var)
+        std[~(std > 0)] = 1.0
+        mean[~np.isfinite(mean)] = 0.0
+        self.vectors = np.where(matrix.mask, (logged - mean) / std, 0.0).astype(np.float32)
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+
+    def weight_vector(self, weights=None):
+        """Per-column weights: 1.0 unless overridden by a nutrient -> weight mapping"""
+        vector = np.ones(len(self.matrix.nutrients), dtype=np.float32)
+        for nutrient, weight in (weights or {}).items():
+            if weight < 0:
+                raise ValueError(f"Weight for {nutrient} must not be negative")
+            vector[self.matrix.column(nutrient)] = weight
+        return vector
+
+    def _space(self, weights):
+        if weights is None:
+            return self.vectors, self.norms
+        scaled = self.vectors * np.sqrt(self.weight_vector(weights))
+        return scaled, np.einsum('ij,ij->i', scaled, scaled)
+
+    @staticmethod
+    def _top(distances, candidates, k):
+        """k nearest candidates ordered by (distance, row), so ties break deterministically"""
+        if len(candidates) > k:
+            keep = np.argpartition(distances, k - 1)[:k]
+            # Keep every candidate tied with the k-th distance until the final ordering
+            keep = np.flatnonzero(distances <= distances[keep].max())
+            candidates, distances = candidates[keep], distances[keep]
+        order = np.lexsort((candidates, distances))[:k]
+        return candidates[order], distances[order]
+
+    def nearest(self, row, k=5, weights=None, allowed=None):
+        """(rows, distances) of the k foods closest to row, excluding itself
+
+        allowed is an optional boolean row mask restricting the candidates.
+        """
+        vectors, norms = self._space(weights)
+        candidates = np.arange(len(vectors)) if allowed is None else np.flatnonzero(allowed)
+        candidates = candidates[candidates != row]
+        distances = vectors[candidates] @ vectors[row]
+        distances *= -2.0
+        distances += norms[candidates]
+        distances += norms[row]
+        rows, distances = self._top(np.maximum(distances, 0.0), candidates, k)
+        return rows, np.sqrt(distances)
+
+    def all_nearest(self, k=5, weights=None, rows=None, candidates=None, workers=None):
+        """k nearest neighbours of every row (or the given rows) among all (or the given) candidates
+
+        Returns (neighbour rows, distances), both shaped (len(rows), k) and padded with
+        -1 / inf where fewer than k candidates exist. Query rows are processed in blocks,
+        spread over workers threads (default: one per CPU), so the distance matrices in
+        flight stay under MAX_BLOCK elements.
+        """
+        workers = workers or os.cpu_count() or 1
+        vectors, norms = self._space(weights)
+        rows = np.arange(len(vectors)) if rows is None else np.asarray(rows, dtype=np.intp)
+        candidates = np.arange(len(vectors)) if candidates is None else np.asarray(candidates, dtype=np.intp)
+        neighbours = np.full((len(rows), k), -1, dtype=np.intp)
+        distances = np.full((len(rows), k), np.inf, dtype=np.float32)
+        if not len(candidates) or not len(rows):
+            return neighbours, distances
+
+        candidate_vectors = vectors[candidates]
+        candidate_norms = norms[candidates]
+        by_row = np.argsort(candidates, kind='stable')
+        width = min(k, len(candidates))
+
+        def run_block(start):
+            queries = rows[start:start + block]
+            block_distances = vectors[queries] @ candidate_vectors.T
+            block_distances *= -2.0
+            block_distances += candidate_norms[None, :]
+            block_distances += norms[queries][:, None]
+            np.maximum(block_distances, 0.0, out=block_distances)
+            # A food is never its own substitute
+            positions = by_row[np.searchsorted(candidates, queries, sorter=by_row).clip(max=len(candidates) - 1)]
+            own = np.flatnonzero(candidates[positions] == queries)
+            block_distances[own, positions[own]] = np.inf
+
+            nearest = np.argpartition(block_distances, width - 1, axis=1)[:, :width]
+            nearest_distances = np.take_along_axis(block_distances, nearest, axis=1)
+            ranked = np.lexsort((candidates[nearest], nearest_distances), axis=1)
+            nearest = np.take_along_axis(nearest, ranked, axis=1)
+            nearest_distances = np.take_along_axis(nearest_distances, ranked, axis=1)
+            # Rows tied at the k-th distance (or short of candidates) take the exact path
+            ties = np.count_nonzero(block_distances <= nearest_distances[:, -1:], axis=1) > width
+            ties |= ~np.isfinite(nearest_distances[:, -1])
+            for i in np.flatnonzero(ties):
+                finite = np.flatnonzero(np.isfinite(block_distances[i]))
+                found, found_distances = self._top(block_distances[i, finite], candidates[finite], k)
+                neighbours[start + i, :len(found)] = found
+                distances[start + i, :len(found)] = np.sqrt(found_distances)
+            plain = np.flatnonzero(~ties)
+            neighbours[start + plain, :width] = candidates[nearest[plain]]
+            distances[start + plain, :width] = np.sqrt(nearest_distances[plain])
+
+        # NumPy releases the GIL in matmul and partitioning, so blocks run in parallel threads
+        block = max(1, self.MAX_BLOCK // (len(candidates) * workers))
+        starts = range(0, len(rows), block)
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(run_block, starts))
+        else:
+            for start in starts:
+                run_block(start)
+        return neighbours, distances
@@ -0,0 +1,145 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(text):
+    """Normalize a name for lookup: Unicode NFC, casefolded, whitespace collapsed"""
+    return WHITESPACE.sub(' ', unicodedata.normalize('NFC', str(text)).casefold()).strip()
+
+
+class NGramIndex:
+    """Inverted n-gram index answering substring queries over short name fields
+
+    Selective queries intersect posting lists. Queries shorter than n, or whose rarest
+    n-gram still covers more than scan_fraction of the documents, are answered by a
+    single str.find pass over all fields joined into one string, which beats building
+    and intersecting huge id sets.
+    """
+
+    def __init__(self, n=3, scan_fraction=0.05):
+        self.n = n
+        self.scan_fraction = scan_fraction
+        self.postings = {}
+        self.fields = []
+        self._text = None    # every document joined with separators, built on first scan
+        self._starts = None  # offset of each document in _text
+
+    def _grams(self, text):
+        """Yield the n-grams of a string (the whole string if it is shorter than n)"""
+        if len(text) < self.n:
+            if text:
+                yield text
+            return
+        for i in range(len(text) - self.n + 1):
+            yield text[i:i + self.n]
+
+    def add(self, texts):
+        """Index a document made of several name fields and return its id"""
+        doc_id = len(self.fields)
+        fields = tuple(text for text in texts if text)
+        self.fields.append(fields)
+        for text in fields:
+            for gram in self._grams(text):
+                self.postings.setdefault(gram, set()).add(doc_id)
+        self._text = self._starts = None
+        return doc_id
+
+    def freeze(self):
+        """Build the joined text used for broad queries now rather than on the first one"""
+        if self._text is None:
+            # \x00 ends a document and \x01 separates its fields; neither occurs in names
+            starts, offset = [], 0
+            for fields in self.fields:
+                starts.append(offset)
+                offset += sum(len(text) for text in fields) + len(fields)
+            self._starts = starts
+            self._text = ''.join('\x01'.join(fields) + '\x00' for fields in self.fields)
+
+    def _scan(self, query):
+        """Sorted ids of documents containing query, by one pass over the joined text"""
+        self.freeze()
+        text, starts = self._text, self._starts
+        found = []
+        position = text.find(query)
+        while position >= 0:
+            doc_id = bisect.bisect_right(starts, position) - 1
+            found.append(doc_id)
+            if doc_id + 1 == len(starts):
+                break
+            position = text.find(query, starts[doc_id + 1])
+        return found
+
+    def search(self, query):
+        """Return sorted ids of documents having a field that contains query"""
+        if not query:
+            return list(range(len(self.fields)))
+        if len(query) < self.n:
+            return self._scan(query)
+
+        postings = []
+        for gram in set(self._grams(query)):
+            ids = self.postings.get(gram)
+            if not ids:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        if len(postings[0]) > self.scan_fraction * len(self.fields):
+            return self._scan(query)
+
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                return []
+        return sorted(
+            doc_id for doc_id in candidates
+            if any(query in text for text in self.fields[doc_id])
+        )
+
+
+class PrefixIndex:
+    """Sorted-array prefix index with a precomputed rank per entry for top-k completion
+
+    Entries are (key, rank, item, label); a lower rank is a better suggestion. Lookups
+    binary-search the key range and select the best ranks with NumPy, so cost grows
+    with the log of the index size plus the size of the matching range.
+    """
+
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+        self.keys = [key for key, _, _, _ in entries]
+        self.ranks = np.array([rank for _, rank, _, _ in entries], dtype=np.int64)
+        self.items = [item for _, _, item, _ in entries]
+        self.labels = [label for _, _, _, label in entries]
+
+    def range(self, prefix):
+        """(start, stop) of the entries whose key starts with prefix"""
+        start = bisect.bisect_left(self.keys, prefix)
+        stop = bisect.bisect_left(self.keys, prefix + '\U0010ffff', start)
+        return start, stop
+
+    def top(self, prefix, k):
+        """Up to k (rank, item, label) matches for prefix, best first, at most one per item"""
+        start, stop = self.range(prefix)
+        if start == stop:
+            return []
+        ranks = self.ranks[start:stop]
+        # Over-select so duplicates of one item cannot crowd out the rest
+        pick = min(len(ranks), k * 8)
+        order = np.argpartition(ranks, pick - 1)[:pick] if pick < len(ranks) else np.arange(len(ranks))
+        order = order[np.argsort(ranks[order], kind='stable')]
+
+        results, seen = [], set()
+        for offset in order.tolist():
+            item = self.items[start + offset]
+            if item not in seen:
+                seen.add(item)
+                results.append((int(ranks[offset]), item, self.labels[start + offset]))
+                if len(results) == k:
+                    break
+        return results
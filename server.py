@@ -0,0 +1,341 @@
+"""Lightweight asyncio HTTP/JSON API for EnhancedFoodDataProcessor.
+
+Run with ``python server.py --port 8080``. Endpoints:
+
+    GET  /health
+    GET  /search?q=ragi
+    POST /search/batch        {"names": ["ragi", "toor dal", ...]}
+    GET  /category/<name>
+    GET  /browse?category=Millet&type=&benefits=&cursor=&page_size=20
+    POST /compare             {"foods": ["ragi", "wheat"], "reference": "wheat"}
+    GET  /meals?preference=diabetic
+    GET  /foods?where=Gluten-free AND NOT Grain
+    POST /substitutes         {"food": "rice", "k": 5, "category": "same", "weights": {"fiber": 2}}
+    POST /labels              {"foods": ["ragi", "oats"]}
+    POST /batch               {"requests": [{"method": "GET", "path": "/search?q=ragi"}, ...]}
+
+With ``--watch`` edits to the catalog file are picked up without a restart, and
+``--shards N`` spreads name search over N shard processes (see sharding.py).
+Connections are kept alive (HTTP/1.1 default). Processor calls run on a thread
+pool, or on a process pool with ``--processes`` so CPU-bound fuzzy matching
+does not hold up the event loop.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from trans import EnhancedFoodDataProcessor
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 8 * 1024 * 1024
+MAX_BATCH = 1000
+
+# One processor per process: shared by every connection and worker thread
+_processor = None
+
+
+def _init_processor(catalog_path=None, watch=False, shards=0):
+    global _processor
+    if _processor is None:
+        if catalog_path:
+            _processor = EnhancedFoodDataProcessor(catalog_path, shards=shards)
+        else:
+            _processor = EnhancedFoodDataProcessor(shards=shards)
+        if watch:
+            _processor.watch_catalog()
+    return _processor
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _require_list(body, field):
+    values = (body or {}).get(field)
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise HTTPError(400, f"'{field}' must be a list of strings")
+    return values
+
+
+def _search(params, body):
+    query = params.get('q', [''])[0]
+    if not query.strip():
+        raise HTTPError(400, "Missing query parameter 'q'")
+    info = _processor.get_food_info(query)
+    if isinstance(info, dict):
+        raise HTTPError(404, info["error"])
+    return {"query": query, "results": info}
+
+
+def _search_batch(params, body):
+    return _processor.get_food_info_batch(_require_list(body, 'names'))
+
+
+def _category(params, body, name):
+    return {"category": name, "foods": _processor.get_category_foods(name)}
+
+
+def _browse(params, body):
+    first = lambda name: params.get(name, [''])[0] or None
+    try:
+        page_size = int(first('page_size') or 20)
+    except ValueError:
+        raise HTTPError(400, "'page_size' must be an integer")
+    if not 1 <= page_size <= 500:
+        raise HTTPError(400, "'page_size' must be between 1 and 500")
+    try:
+        return _processor.browse_foods(first('category'), first('type'), first('benefits'), first('cursor'), page_size)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+
+def _compare(params, body):
+    foods = _require_list(body, 'foods')
+    return {
+        "comparison": _processor.create_nutrition_comparison(foods),
+        "values": _processor.compare_nutrition_values(foods, reference=body.get('reference'))
+    }
+
+
+def _meals(params, body):
+    return _processor.plan_meals(params.get('preference', ['balanced'])[0])
+
+
+def _foods(params, body):
+    expression = params.get('where', [''])[0]
+    if not expression.strip():
+        raise HTTPError(400, "Missing query parameter 'where'")
+    try:
+        return {"where": expression, "foods": _processor.find_foods(expression)}
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+
+
+def _is_finite_number(value):
+    # JSON true/false decode to bool (an int subclass); json.loads accepts NaN/Infinity and
+    # integers too large for a float
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+def _substitutes(params, body):
+    body = body or {}
+    if not isinstance(body.get('food'), str) or not body['food'].strip():
+        raise HTTPError(400, "'food' must be a non-empty string")
+    k = body.get('k', 5)
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= 100:
+        raise HTTPError(400, "'k' must be an integer between 1 and 100")
+    weights = body.get('weights')
+    if weights is not None and not (isinstance(weights, dict) and
+                                    all(_is_finite_number(w) for w in weights.values())):
+        raise HTTPError(400, "'weights' must map nutrients to finite numbers")
+    for field in ('category', 'type', 'benefits'):
+        if body.get(field) is not None and not isinstance(body[field], str):
+            raise HTTPError(400, f"'{field}' must be a string")
+    try:
+        result = _processor.find_substitutes(body['food'], k=k, weights=weights, category=body.get('category'),
+                                             food_type=body.get('type'), benefits=body.get('benefits'))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    if "error" in result:
+        raise HTTPError(404, result["error"])
+    return result
+
+
+def _labels(params, body):
+    return {"labels": _processor.create_retail_labels(_require_list(body, 'foods'))}
+
+
+ROUTES = {
+    ('GET', '/health'): lambda params, body: {"status": "ok", "foods": len(_processor.food_database)},
+    ('GET', '/search'): _search,
+    ('POST', '/search/batch'): _search_batch,
+    ('POST', '/compare'): _compare,
+    ('GET', '/meals'): _meals,
+    ('GET', '/foods'): _foods,
+    ('GET', '/browse'): _browse,
+    ('POST', '/substitutes'): _substitutes,
+    ('POST', '/labels'): _labels,
+}
+
+
+def dispatch(method, target, body=None):
+    """Route one request to the processor and return (status, payload); runs in a worker"""
+    _init_processor()
+    url = urlsplit(target)
+    path = url.path.rstrip('/') or '/'
+    params = parse_qs(url.query)
+    try:
+        if body is not None and not isinstance(body, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        if path.startswith('/category/') and method == 'GET':
+            return 200, _category(params, body, unquote(path[len('/category/'):]))
+        if (method, path) == ('POST', '/batch'):
+            requests = (body or {}).get('requests')
+            if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+                raise HTTPError(400, f"'requests' must be a list of at most {MAX_BATCH} requests")
+            responses = []
+            for request in requests:
+                if not isinstance(request, dict):
+                    responses.append({"status": 400, "body": {"error": "Invalid batched request"}})
+                    continue
+                batched_method, batched_path = request.get('method', 'GET'), request.get('path', '')
+                if (not isinstance(batched_method, str) or not isinstance(batched_path, str)
+                        or batched_path.startswith('/batch')):
+                    responses.append({"status": 400, "body": {"error": "Invalid batched request"}})
+                    continue
+                status, payload = dispatch(batched_method.upper(), batched_path, request.get('body'))
+                responses.append({"status": status, "body": payload})
+            return 200, {"responses": responses}
+        handler = ROUTES.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in ROUTES):
+                raise HTTPError(405, f"Method {method} not allowed for {path}")
+            raise HTTPError(404, f"No route for {path}")
+        return 200, handler(params, body)
+    except HTTPError as e:
+        return e.status, {"error": e.message}
+    except KeyError as e:
+        return 400, {"error": str(e.args[0]) if e.args else "Bad request"}
+    except Exception:
+        logger.exception(f"Unhandled error for {method} {target}")
+        return 500, {"error": "Internal server error"}
+
+
+class FoodAPIServer:
+    """asyncio HTTP/1.1 server with keep-alive that offloads processor work to a pool"""
+
+    def __init__(self, host='127.0.0.1', port=8080, workers=4, processes=False, catalog_path=None, watch=False,
+                 shards=0):
+        if processes and shards:
+            raise ValueError("Use either a process pool or search shards, not both")
+        self.host = host
+        self.port = port
+        _init_processor(catalog_path, watch, shards)
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_processor,
+                                                initargs=(catalog_path, watch))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.server = None
+
+    async def _read_request(self, reader):
+        """Parse one request; returns None when the client closed the connection"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0 or length > MAX_BODY:
+            raise HTTPError(413, "Request body too large")
+        body = None
+        if length:
+            raw = await reader.readexactly(length)
+            try:
+                body = json.loads(raw.decode('utf-8'))
+            except ValueError:
+                raise HTTPError(400, "Body must be JSON")
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method.upper(), target, body, keep_alive
+
+    @staticmethod
+    def _response(status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode('latin-1') + data
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    writer.write(self._response(e.status, {"error": e.message}, False))
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = await loop.run_in_executor(self.executor, dispatch, method, target, body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError):
+            pass
+        except Exception:
+            logger.exception("Unhandled error while serving request")
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        logger.info(f"Serving food API on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if _processor is not None:
+            _processor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON API server for the food data processor")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=4, help="pool size for processor calls")
+    parser.add_argument('--processes', action='store_true', help="use a process pool instead of threads")
+    parser.add_argument('--catalog', default=None, help="catalog JSON or snapshot (defaults to Dataset/food_database.json)")
+    parser.add_argument('--watch', action='store_true', help="reload the catalog whenever its file changes")
+    parser.add_argument('--shards', type=int, default=0, help="search shard processes (0 searches in-process)")
+    args = parser.parse_args()
+
+    server = FoodAPIServer(args.host, args.port, args.workers, args.processes, args.catalog, args.watch,
+                           args.shards)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
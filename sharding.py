@@ -0,0 +1,308 @@
+"""Multi-process sharded search for catalogs too large for one search process.
+
+The catalog is split into contiguous row ranges, one per worker process. Every
+worker maps the same snapshot file (see snapshot.py) and decodes only its own
+rows, so the raw catalog is shared through the page cache rather than copied
+per process. Each query is sent to every shard, and the per-shard results are
+merged on a deterministic ranking:
+
+    direct name matches in catalog order, then phonetic mapping matches in
+    mapping order;
+    failing those anywhere, foods sharing the query's phonetic key, in the
+    order the unsharded search gives them;
+    failing that, the fuzzy fallback by score, then name, and then the same
+    over close phonetic keys.
+
+Shards answer whole batches of queries per round trip, so search_many keeps
+the shard processes busy while the coordinator only merges small row lists.
+Each fallback takes a further round for just the queries nothing matched so
+far. Every shard scores the full fuzzy candidate budget over its own names, so
+results do not depend on the shard count.
+
+Every shard listens on several channels (one pipe each), and a caller holds one
+channel per shard only for its own round trip, so concurrent callers pipeline
+their batches instead of queueing behind a single lock. If a shard process dies
+the pool is marked broken and every later call raises RuntimeError, on which
+the processor searches in-process and, after a backoff, starts a new pool.
+"""
+import heapq
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from multiprocessing.connection import wait
+
+from catalog import SNAPSHOT_MAGIC, FoodCatalog
+from indexes import CatalogIndexes
+from snapshot import Snapshot, write_snapshot
+from transliterate import phonetic_key
+
+logger = logging.getLogger(__name__)
+
+DIRECT, PHONETIC, PHONETIC_KEY = 0, 1, 2
+
+
+class SearchShard(CatalogIndexes):
+    """Name search indexes over one slice of the catalog, answering with global rows"""
+
+    def __init__(self, catalog, phonetic_mappings, offset):
+        self.catalog = catalog
+        self.food_database = catalog.by_name
+        self.food_keys = list(self.food_database)
+        self.phonetic_mappings = {phonetic: telugu for phonetic, telugu in phonetic_mappings.items()
+                                  if telugu in self.food_database}
+        self.offset = offset
+        self.row_of = {telugu_name: offset + row for row, telugu_name in enumerate(self.food_keys)}
+        self.mapping_rank = {phonetic: rank for rank, phonetic in enumerate(phonetic_mappings)}
+        self._build_search_indexes()
+
+    def _build_prefix_indexes(self, phonetic_entries):
+        """Rank of each food within each phonetic key's list, as the full catalog orders it
+
+        Autocomplete stays with the coordinator's full indexes. The full key lists hold
+        foods reached through one of their own names in catalog order, then foods
+        reached only through a phonetic mapping in mapping order.
+        """
+        self.key_rank = {}
+        for key, telugu_name, name in phonetic_entries:
+            data = self.food_database[telugu_name]
+            own = name in (telugu_name, data['english'], data['hindi'], data.get('tamil', ''), data.get('kannada', ''))
+            rank = (0, self.row_of[telugu_name]) if own else (1, self.mapping_rank[name])
+            self.key_rank.setdefault((key, telugu_name), rank)
+
+    def search(self, query):
+        """[(stage, rank, ..., row), ...] of direct and phonetic matches for a normalized query, best first"""
+        ranked, seen = [], set()
+        for doc_id in self.name_index.search(query):
+            seen.add(self.food_keys[doc_id])
+            ranked.append((DIRECT, self.offset + doc_id))
+
+        for doc_id in self.phonetic_index.search(query):
+            phonetic = self.phonetic_keys[doc_id]
+            telugu = self.phonetic_mappings[phonetic]
+            if telugu not in seen:
+                seen.add(telugu)
+                ranked.append((PHONETIC, self.mapping_rank[phonetic], self.row_of[telugu]))
+        ranked.sort()
+        return ranked
+
+    def key(self, query):
+        """[(stage, rank, row), ...] of foods sharing the query's phonetic key, best first"""
+        key = phonetic_key(query)
+        return sorted((PHONETIC_KEY, self.key_rank[(key, telugu)], self.row_of[telugu])
+                      for telugu in self.phonetic_key_index.get(key, ()))
+
+    def fuzzy(self, query, candidates):
+        """[(score, name, rows), ...] best of the coordinator's fuzzy candidate names held here"""
+        return [(score, name, [self.row_of[telugu] for telugu in items])
+                for score, name, items in self.fuzzy_matcher.score_names(query, candidates)]
+
+    def key_fuzzy(self, query, candidates):
+        """[(score, key, rows), ...] best close matches of the query's phonetic key among the coordinator's candidates"""
+        return [(score, key, [self.row_of[telugu] for telugu in items])
+                for score, key, items in self.key_matches(query, candidates=candidates)]
+
+
+def _serve(connections, snapshot_path, start, stop, phonetic_mappings):
+    """Worker loop: build one shard, then answer (stage, [args, ...]) batches on any channel until all close"""
+    shard = SearchShard(FoodCatalog(Snapshot(snapshot_path).records(start, stop)), phonetic_mappings, start)
+    connections = list(connections)
+    connections[0].send(len(shard.food_keys))
+    while connections:
+        for connection in wait(connections):
+            try:
+                message = connection.recv()
+            except EOFError:
+                message = None
+            if message is None:
+                connections.remove(connection)
+                connection.close()
+                continue
+            stage, batch = message
+            find = {'search': shard.search, 'key': shard.key, 'fuzzy': shard.fuzzy, 'keys': shard.key_fuzzy}[stage]
+            connection.send([find(*args) for args in batch])
+
+
+def merge_ranked(shard_results):
+    """Merge one query's per-shard direct/phonetic matches into global rows, best first"""
+    return [ranked[-1] for ranked in heapq.merge(*shard_results)]
+
+
+def merge_fuzzy(shard_results, limit=3, max_rows=None):
+    """Rows of the best distinct fuzzy names across shards, at most max_rows of them if given;
+    a name may carry rows in several shards"""
+    candidates = {}
+    for fuzzy in shard_results:
+        for score, name, rows in fuzzy:
+            candidates.setdefault((-score, name), []).extend(rows)
+    rows, seen = [], set()
+    for key in sorted(candidates)[:limit]:
+        for row in sorted(candidates[key]):
+            if row not in seen:
+                seen.add(row)
+                rows.append(row)
+    return rows[:max_rows]
+
+
+class ShardedSearch:
+    """Scatter-gather search over a pool of shard processes for one catalog version
+
+    indexes are the catalog's full CatalogIndexes; their fuzzy prefilters pick the
+    candidates every shard scores, so results match the unsharded search exactly.
+    snapshot_path may name an existing snapshot of the catalog; otherwise one is
+    written to a temporary file that lives as long as the pool. Up to channels
+    callers can have a round trip in flight at once.
+    """
+
+    def __init__(self, indexes, shards=None, snapshot_path=None, channels=4):
+        self.indexes = indexes
+        self.catalog = catalog = indexes.catalog
+        phonetic_mappings = indexes.phonetic_mappings
+        self._lock = threading.Lock()
+        self._closed = False
+        self._broken = False
+        self._tmpdir = None
+        if snapshot_path is None or not _is_snapshot(snapshot_path):
+            self._tmpdir = tempfile.TemporaryDirectory(prefix='milletmitra-shards-')
+            snapshot_path = os.path.join(self._tmpdir.name, 'catalog.snap')
+            write_snapshot(catalog, snapshot_path)
+
+        size = len(catalog.records)
+        shards = max(1, min(shards or os.cpu_count() or 1, size or 1))
+        bounds = [size * i // shards for i in range(shards + 1)]
+        # Spawned (not forked) workers: the parent may be running watcher or server threads
+        context = multiprocessing.get_context('spawn')
+        channel_ends = [[] for _ in range(channels)]  # channel -> parent end per shard
+        self._processes = []
+        for start, stop in zip(bounds, bounds[1:]):
+            pipes = [context.Pipe() for _ in range(channels)]
+            process = context.Process(target=_serve, args=([child for _, child in pipes], snapshot_path, start, stop,
+                                                            phonetic_mappings),
+                                      name=f"search-shard-{start}-{stop}", daemon=True)
+            process.start()
+            for ends, (parent, child) in zip(channel_ends, pipes):
+                child.close()
+                ends.append(parent)
+            self._processes.append(process)
+        sizes = [connection.recv() for connection in channel_ends[0]]
+        self._connections = [connection for ends in channel_ends for connection in ends]
+        self._channel_count = channels
+        self._channels = queue.Queue()
+        for ends in channel_ends:
+            self._channels.put(ends)
+        logger.info(f"Started {len(sizes)} search shards over {size} foods")
+
+    @property
+    def shards(self):
+        return len(self._processes)
+
+    def _scatter(self, stage, batch):
+        """Send one batch of argument tuples to every shard and return each entry's per-shard replies"""
+        if self._closed or self._broken:
+            raise RuntimeError("Sharded search is closed" if self._closed else "Sharded search is broken")
+        connections = self._channels.get()
+        try:
+            for connection in connections:
+                connection.send((stage, batch))
+            replies = [connection.recv() for connection in connections]
+        except (EOFError, OSError) as e:
+            self._fail(e)
+            raise RuntimeError("Sharded search is broken") from e
+        finally:
+            self._channels.put(connections)
+        return zip(*replies)
+
+    def _fail(self, error):
+        """Mark the pool broken after a shard stopped answering, and stop the rest"""
+        with self._lock:
+            if self._broken or self._closed:
+                return
+            self._broken = True
+        logger.error(f"Search shard failed ({error!r}); searching in-process until the pool is replaced")
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+
+    def search_rows(self, queries):
+        """Global result rows for each normalized query, in input order
+
+        Each later round runs only for queries that matched nothing on any shard so
+        far: exact phonetic keys, then fuzzy names, then close phonetic keys (capped
+        at key_matcher.limit foods). Fuzzy candidates come from the full indexes'
+        prefilters here; the shards only score them.
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        results = [merge_ranked(replies) for replies in self._scatter('search', [(query,) for query in queries])]
+        fuzzy_matcher, key_matcher = self.indexes.fuzzy_matcher, self.indexes.key_matcher
+        rounds = (
+            ('key', lambda query: (query,), merge_ranked),
+            ('fuzzy', lambda query: (query, fuzzy_matcher.candidates(query)),
+             lambda replies: merge_fuzzy(replies, fuzzy_matcher.limit)),
+            ('keys', lambda query: (query, key_matcher.candidates(phonetic_key(query))),
+             lambda replies: merge_fuzzy(replies, key_matcher.limit, key_matcher.limit)),
+        )
+        for stage, request, merge in rounds:
+            unmatched = [i for i, rows in enumerate(results) if not rows]
+            if not unmatched:
+                break
+            for i, replies in zip(unmatched, self._scatter(stage, [request(queries[i]) for i in unmatched])):
+                results[i] = merge(replies)
+        return results
+
+    def search_many(self, queries):
+        """[(telugu_name, record), ...] for each normalized query, in input order"""
+        records = self.catalog.records
+        return [[(records[row].telugu, records[row]) for row in rows] for rows in self.search_rows(queries)]
+
+    def search(self, query):
+        return self.search_many([query])[0]
+
+    @property
+    def broken(self):
+        return self._broken
+
+    def close(self):
+        """Stop the shard processes and remove the temporary snapshot"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # Wait (briefly) for in-flight round trips to hand their channels back
+        for _ in range(self._channel_count):
+            try:
+                connections = self._channels.get(timeout=5)
+            except queue.Empty:
+                break
+            for connection in connections:
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+        for connection in self._connections:
+            connection.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._connections, self._processes = [], []
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _is_snapshot(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    except OSError:
+        return False
@@ -0,0 +1,303 @@
+"""Compact, memory-mappable catalog snapshots plus JSON Lines export and incremental import.
+
+Snapshot layout (little-endian):
+
+    MMSNAP01 | uint32 header length | JSON header | padding | arrays...
+
+Every array starts on an 8-byte boundary and is described in the header by
+(dtype, shape, offset), so a reader maps the file and wraps each array with
+np.frombuffer without copying. Strings are deduplicated into one UTF-8 blob
+with int64 offsets; records refer to them by int32 id. Benefits and nutrient
+entries are stored CSR-style (per-record offsets into flat arrays), and the
+normalized foods x nutrients matrix is stored as-is for NutrientMatrix.
+
+    python snapshot.py report --repeat 1000
+"""
+import argparse
+import functools
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from catalog import DEFAULT_CATALOG_PATH, SNAPSHOT_MAGIC, FoodCatalog, FoodRecord, file_version, load_catalog
+from nutrients import NutrientMatrix
+
+SNAPSHOT_FORMAT = 1
+NAME_FIELDS = ('telugu', 'english', 'hindi', 'tamil', 'kannada', 'category', 'type')
+ALIGNMENT = 8
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+
+    def __call__(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+        return string_id
+
+    def arrays(self):
+        encoded = [text.encode('utf-8') for text in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def write_snapshot(catalog, path):
+    """Write a catalog as a snapshot file and return its size in bytes"""
+    strings = _StringTable()
+    strings('')
+    records = catalog.records
+    arrays = {field: np.array([strings(getattr(r, field)) for r in records], dtype=np.int32)
+              for field in NAME_FIELDS}
+
+    arrays['benefit_offsets'] = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum([len(r.benefits) for r in records], out=arrays['benefit_offsets'][1:])
+    arrays['benefit_ids'] = np.array([strings(b) for r in records for b in r.benefits], dtype=np.int32)
+
+    arrays['nutrient_offsets'] = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum([len(r.nutrients) for r in records], out=arrays['nutrient_offsets'][1:])
+    entries = [entry for r in records for entry in r.nutrients]
+    arrays['nutrient_name_ids'] = np.array([strings(name) for name, _, _, _ in entries], dtype=np.int32)
+    arrays['nutrient_text_ids'] = np.array([strings(text) for _, text, _, _ in entries], dtype=np.int32)
+    arrays['nutrient_amounts'] = np.array([np.nan if value is None else value for _, _, value, _ in entries],
+                                          dtype=np.float64)
+    arrays['nutrient_unit_ids'] = np.array([strings(unit) for _, _, _, unit in entries], dtype=np.int32)
+
+    matrix = NutrientMatrix(catalog)
+    arrays['matrix_values'] = np.ascontiguousarray(matrix.values, dtype=np.float64)
+    arrays['matrix_mask'] = np.ascontiguousarray(matrix.mask, dtype=np.bool_)
+    arrays['string_data'], arrays['string_offsets'] = strings.arrays()
+
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    header = json.dumps({
+        "format": SNAPSHOT_FORMAT,
+        "foods": len(records),
+        "nutrients": matrix.nutrients,
+        "units": matrix.units,
+        "arrays": layout
+    }, ensure_ascii=False).encode('utf-8')
+
+    prefix = SNAPSHOT_MAGIC + struct.pack('<I', len(header)) + header
+    data_start = -(-len(prefix) // ALIGNMENT) * ALIGNMENT
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix.ljust(data_start, b'\0'))
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][2])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+class Snapshot:
+    """Read-only view of a snapshot file; arrays are zero-copy views of the mapped file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        start = len(SNAPSHOT_MAGIC)
+        (header_length,) = struct.unpack_from('<I', self._mmap, start)
+        start += 4
+        self.header = json.loads(self._mmap[start:start + header_length].decode('utf-8'))
+        if self.header["format"] != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format {self.header['format']}")
+        data_start = -(-(start + header_length) // ALIGNMENT) * ALIGNMENT
+
+        self.arrays = {}
+        for name, (dtype, shape, offset) in self.header["arrays"].items():
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape, dtype=np.int64))
+            self.arrays[name] = np.frombuffer(self._mmap, dtype=dtype, count=count,
+                                              offset=data_start + offset).reshape(shape)
+        self._strings = None
+
+    def __len__(self):
+        return self.header["foods"]
+
+    def string(self, string_id):
+        offsets = self.arrays['string_offsets']
+        return self.arrays['string_data'][offsets[string_id]:offsets[string_id + 1]].tobytes().decode('utf-8')
+
+    def strings(self):
+        """Every string in the table, decoded once"""
+        if self._strings is None:
+            data = self.arrays['string_data'].tobytes()
+            offsets = self.arrays['string_offsets'].tolist()
+            self._strings = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def nutrient_columns(self):
+        """(nutrients, units, values, mask) in the form NutrientMatrix uses"""
+        return (self.header["nutrients"], self.header["units"],
+                self.arrays['matrix_values'], self.arrays['matrix_mask'])
+
+    def records(self, start=0, stop=None):
+        """Yield FoodRecords in catalog order, optionally only rows [start, stop)
+
+        A partial read decodes just the strings its rows use, so processes that each
+        take a slice of one mapped file share the rest through the page cache.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start == 0 and stop == len(self):
+            string = self.strings().__getitem__
+        else:
+            string = functools.lru_cache(maxsize=None)(self.string)
+        a = self.arrays
+        names = [a[field][start:stop].tolist() for field in NAME_FIELDS]
+        benefit_offsets = a['benefit_offsets'][start:stop + 1].tolist()
+        nutrient_offsets = a['nutrient_offsets'][start:stop + 1].tolist()
+        benefit_ids = a['benefit_ids'][benefit_offsets[0]:benefit_offsets[-1]].tolist()
+        nutrient_slice = slice(nutrient_offsets[0], nutrient_offsets[-1])
+        nutrients = list(zip(
+            (sys.intern(string(i)) for i in a['nutrient_name_ids'][nutrient_slice].tolist()),
+            (string(i) for i in a['nutrient_text_ids'][nutrient_slice].tolist()),
+            (None if value != value else value for value in a['nutrient_amounts'][nutrient_slice].tolist()),
+            (sys.intern(string(i)) for i in a['nutrient_unit_ids'][nutrient_slice].tolist())
+        ))
+        benefit_base, nutrient_base = benefit_offsets[0], nutrient_offsets[0]
+        for row in range(stop - start):
+            yield FoodRecord.from_fields(
+                *(string(column[row]) for column in names),
+                benefits=[string(i) for i in benefit_ids[benefit_offsets[row] - benefit_base:
+                                                          benefit_offsets[row + 1] - benefit_base]],
+                nutrients=nutrients[nutrient_offsets[row] - nutrient_base:nutrient_offsets[row + 1] - nutrient_base]
+            )
+
+    def to_catalog(self, version=None):
+        return FoodCatalog(self.records(), version=version, nutrient_columns=self.nutrient_columns())
+
+
+def load_snapshot(path, version=None):
+    """Load a snapshot file as a FoodCatalog whose nutrient matrix stays memory-mapped"""
+    return Snapshot(path).to_catalog(version=version if version is not None else file_version(path))
+
+
+def write_jsonl(records, path):
+    """Stream records to a JSON Lines file, one {"telugu": ..., ...} object per line; returns the count"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps({"telugu": record.telugu, **record.to_dict()}, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_jsonl(path):
+    """Yield FoodRecords from a JSON Lines file, skipping blank lines"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                yield FoodRecord.from_dict(data.pop('telugu'), data)
+
+
+def apply_changes(catalog, records, removed=()):
+    """Merge incoming records into a catalog, touching only items that changed
+
+    Returns (catalog, changes) where changes lists the added, updated and removed
+    Telugu names; the original catalog is returned unchanged when nothing differs.
+    """
+    changes = {"added": [], "updated": [], "removed": []}
+    replacements = {}
+    for record in records:
+        current = catalog.by_name.get(record.telugu)
+        if current is None:
+            changes["added"].append(record.telugu)
+        elif current != record:
+            changes["updated"].append(record.telugu)
+        else:
+            continue
+        replacements[record.telugu] = record
+    removed = set(removed)
+    changes["removed"] = [telugu for telugu in catalog.by_name if telugu in removed]
+    if not any(changes.values()):
+        return catalog, changes
+
+    merged = [replacements.pop(r.telugu, r) for r in catalog.records if r.telugu not in removed]
+    merged.extend(replacements.values())
+    return FoodCatalog(merged), changes
+
+
+def format_report(catalog_path=DEFAULT_CATALOG_PATH, repeat=1, rounds=3):
+    """Sizes and load times of the JSON, JSON Lines and snapshot formats for one catalog"""
+    catalog = load_catalog(catalog_path)
+    if repeat > 1:
+        catalog = FoodCatalog(
+            FoodRecord.from_dict(f"{record.telugu} {i}", {**record.to_dict(), "english": f"{record.english} {i}"})
+            for i in range(repeat) for record in catalog.records
+        )
+
+    def best_of(load):
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            load()
+            times.append(time.perf_counter() - start)
+        return round(min(times) * 1000, 3)
+
+    def load_json(path):
+        with open(path, encoding='utf-8') as f:
+            return FoodCatalog.from_dict(json.load(f))
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {name: os.path.join(directory, f"catalog.{name}") for name in ('json', 'jsonl', 'snap')}
+        with open(paths['json'], 'w', encoding='utf-8') as f:
+            json.dump(catalog.to_dict(), f, ensure_ascii=False, indent=2)
+        write_jsonl(catalog.records, paths['jsonl'])
+        write_snapshot(catalog, paths['snap'])
+
+        report = {
+            "foods": len(catalog),
+            "json": {"bytes": os.path.getsize(paths['json']),
+                     "load_ms": best_of(lambda: load_json(paths['json']))},
+            "jsonl": {"bytes": os.path.getsize(paths['jsonl']),
+                      "load_ms": best_of(lambda: FoodCatalog(iter_jsonl(paths['jsonl'])))},
+            "snapshot": {"bytes": os.path.getsize(paths['snap']),
+                         "map_ms": best_of(lambda: Snapshot(paths['snap'])),
+                         "load_ms": best_of(lambda: load_snapshot(paths['snap']))},
+        }
+        report["snapshot"]["size_vs_json"] = round(report["snapshot"]["bytes"] / report["json"]["bytes"], 3)
+        report["snapshot"]["load_speedup_vs_json"] = round(
+            report["json"]["load_ms"] / max(report["snapshot"]["load_ms"], 1e-3), 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog snapshot tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="write a catalog as a snapshot or JSON Lines file")
+    export.add_argument('output', help="*.jsonl writes JSON Lines, anything else a snapshot")
+    export.add_argument('--catalog', default=DEFAULT_CATALOG_PATH)
+    report = commands.add_parser('report', help="compare sizes and load times with the JSON catalog")
+    report.add_argument('--catalog', default=DEFAULT_CATALOG_PATH)
+    report.add_argument('--repeat', type=int, default=1, help="replicate the catalog to a larger size")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        catalog = load_catalog(args.catalog)
+        if args.output.endswith('.jsonl'):
+            write_jsonl(catalog.records, args.output)
+        else:
+            write_snapshot(catalog, args.output)
+        print(f"Wrote {len(catalog)} foods to {args.output}")
+    else:
+        print(json.dumps(format_report(args.catalog, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
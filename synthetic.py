@@ -0,0 +1,150 @@
+"""Synthetic multilingual catalogs and query mixes for benchmarks.
+
+Catalogs follow the food_database schema. Names are pronounceable Latin stems
+transliterated into Telugu, Devanagari, Tamil and Kannada, and nutrient values are
+drawn from the ranges seen per category in the real catalog.
+"""
+import random
+
+from catalog import load_catalog
+from transliterate import transliterate
+
+CONSONANTS = ['k', 'g', 'ch', 'j', 't', 'd', 'n', 'p', 'b', 'm', 'y', 'r', 'l', 'v', 's', 'sh', 'h', 'dh', 'bh', 'kh']
+VOWELS = ['a', 'a', 'aa', 'i', 'ee', 'u', 'oo', 'e', 'o']
+SUFFIXES = {
+    'Millet': ['lu', 'alu', ' rava', ' pindi', ''],
+    'Pulse': [' pappu', 'lu', ' dal'],
+    'Grain': ['lu', ' rava', ' biyyam', ''],
+    'Spice': ['lu', ' podi', ''],
+    'Seeds': [' ginjalu', ' vittanalu', 'lu'],
+}
+ENGLISH_WORDS = {'Millet': 'Millet', 'Pulse': 'Dal', 'Grain': 'Grain', 'Spice': 'Spice', 'Seeds': 'Seeds'}
+CATEGORY_WEIGHTS = {'Millet': 0.45, 'Pulse': 0.2, 'Grain': 0.15, 'Spice': 0.1, 'Seeds': 0.1}
+QUERY_MIX = {'exact': 0.3, 'substring': 0.2, 'phonetic': 0.2, 'misspelled': 0.15, 'non_latin': 0.15}
+
+# Spelling variants people type for the same sound
+RESPELLINGS = [('aa', 'a'), ('ee', 'i'), ('oo', 'u'), ('v', 'w'), ('sh', 's'), ('dh', 'd'), ('a', 'aa'), ('i', 'ee')]
+
+
+def _profiles(catalog):
+    """Per category: types, benefits and (probability, low, high, unit) per nutrient"""
+    profiles = {}
+    for record in catalog.records:
+        profile = profiles.setdefault(record.category, {"count": 0, "types": [], "benefits": [], "nutrients": {}})
+        profile["count"] += 1
+        profile["types"].append(record.type)
+        profile["benefits"].extend(record.benefits)
+        for name, _, value, unit in record.nutrients:
+            if value is not None:
+                profile["nutrients"].setdefault(name, []).append((value, unit))
+    for profile in profiles.values():
+        profile["benefits"] = sorted(set(profile["benefits"]))
+        profile["nutrients"] = {
+            name: (len(seen) / profile["count"], min(v for v, _ in seen), max(v for v, _ in seen), seen[0][1])
+            for name, seen in profile["nutrients"].items()
+        }
+    return profiles
+
+
+def _stem(rng):
+    return ''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+
+
+def generate_catalog(size, seed=0, base=None):
+    """A {telugu_name: entry} dict of size foods, starting with the real catalog's items"""
+    rng = random.Random(seed)
+    base = base if base is not None else load_catalog()
+    profiles = _profiles(base)
+    categories = [c for c in CATEGORY_WEIGHTS if c in profiles]
+    weights = [CATEGORY_WEIGHTS[c] for c in categories]
+
+    data = {}
+    for record in base.records[:size]:
+        data[record.telugu] = record.to_dict()
+    while len(data) < size:
+        category = rng.choices(categories, weights)[0]
+        profile = profiles[category]
+        latin = _stem(rng) + rng.choice(SUFFIXES[category])
+        telugu = transliterate(latin, 'telugu')
+        if telugu in data:
+            continue
+        nutrition = {}
+        for name, (probability, low, high, unit) in profile["nutrients"].items():
+            if rng.random() < max(probability, 0.8 if name in ('protein', 'fiber') else 0.0):
+                nutrition[name] = f"{rng.uniform(low * 0.7, high * 1.3):.1f}{unit}"
+        data[telugu] = {
+            "english": f"{latin.split()[0].title()} {ENGLISH_WORDS[category]}",
+            "hindi": transliterate(latin, 'devanagari'),
+            "tamil": transliterate(latin, 'tamil'),
+            "kannada": transliterate(latin, 'kannada'),
+            "category": category,
+            "type": rng.choice(profile["types"]),
+            "benefits": rng.sample(profile["benefits"], min(len(profile["benefits"]), rng.randint(2, 5))),
+            "nutrition": nutrition
+        }
+    return data
+
+
+def _misspell(rng, text):
+    chars = list(text)
+    if len(chars) < 4:
+        return text
+    i = rng.randrange(1, len(chars) - 1)
+    edit = rng.random()
+    if edit < 0.4:
+        chars[i] = rng.choice('aeioukmnrst')
+    elif edit < 0.7:
+        del chars[i]
+    else:
+        chars[i - 1], chars[i] = chars[i], chars[i - 1]
+    return ''.join(chars)
+
+
+def _respell(rng, text):
+    options = [(old, new) for old, new in RESPELLINGS if old in text]
+    if not options:
+        return text
+    old, new = rng.choice(options)
+    return text.replace(old, new, 1)
+
+
+def generate_queries(data, count, seed=0, mix=None):
+    """count (kind, query) pairs drawn from a catalog dict according to a kind -> weight mix"""
+    rng = random.Random(seed)
+    mix = mix or QUERY_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    items = list(data.items())
+
+    queries = []
+    for kind in rng.choices(kinds, weights, k=count):
+        telugu, entry = rng.choice(items)
+        english = entry['english'].lower()
+        if kind == 'exact':
+            query = rng.choice([entry['english'], telugu])
+        elif kind == 'substring':
+            length = rng.randint(3, max(3, len(english) // 2))
+            start = rng.randint(0, max(0, len(english) - length))
+            query = english[start:start + length]
+        elif kind == 'phonetic':
+            query = _respell(rng, english.split()[0])
+        elif kind == 'misspelled':
+            query = _misspell(rng, english)
+        else:
+            query = rng.choice([name for name in (entry.get('hindi'), entry.get('tamil'),
+                                                  entry.get('kannada'), telugu) if name])
+        queries.append((kind, query))
+    return queries
+
+
+def generate_prefixes(data, count, seed=0):
+    """count partially typed names (1-8 characters) in Latin, phonetic and Indic spellings"""
+    rng = random.Random(seed)
+    items = list(data.items())
+    prefixes = []
+    for _ in range(count):
+        telugu, entry = rng.choice(items)
+        english = entry['english'].lower()
+        name = rng.choice([english, _respell(rng, english), telugu, entry.get('hindi') or english])
+        prefixes.append(name[:rng.randint(1, min(8, len(name)))])
+    return prefixes
@@ -1,326 +1,803 @@
 import pandas as pd
 import requests
-from googletrans import Translator
-from fuzzywuzzy import fuzz, process
 import time
 import logging
 import re
 import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from search_index import normalize_query
+from transliterate import phonetic_key
+from catalog import DEFAULT_CATALOG_PATH, CatalogWatcher, file_version, load_catalog
+from indexes import CatalogIndexes
+from cache import LRUCache
+from benefits import fold_benefit
+from browse import encode_cursor, page_rows
+from metrics import SearchMetrics
+from sharding import ShardedSearch
+from labels import label_fields, render_labels
+from snapshot import apply_changes, iter_jsonl, write_jsonl, write_snapshot
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Phonetic mapping for search
+PHONETIC_MAPPINGS = {
+    'samalu': 'సామలు', 'ragulu': 'రాగులు', 'varagu': 'వరగు', 'korralu': 'కొర్రలు',
+    'arikelu': 'అరికేలు', 'bajra': 'బజ్రా', 'kandi pappu': 'కంది పప్పు',
+    'pesara pappu': 'పెసర పప్పు', 'minapa pappu': 'మినప పప్పు',
+    'shanaga pappu': 'శనగ పప్పు', 'masoor pappu': 'మసూర పప్పు', 'mysore pappu': 'మసూర పప్పు',
+    'andu korralu': 'బ్రౌన్\u200cటాప్ మిల్లెట్',
+    'godhuma': 'గోధుమ', 'biyyam': 'బియ్యం', 'quinoa': 'క్వినోవా',
+    'oats': 'వోట్స్', 'menthulu': 'మెంతులు', 'jilakarra': 'జిలకర్ర',
+    'nuvvulu': 'నువ్వులు', 'chia seeds': 'చియా సీడ్స్'
+}
+
+
+# Seconds a broken shard pool is left alone before it is restarted
+SHARD_RESTART_BACKOFF = 30.0
+
+
+def _versioned(catalog):
+    """Give an unversioned catalog a unique version, since cached results are told apart by it"""
+    if catalog.version is None:
+        catalog.version = f"unversioned+{time.time_ns():x}"
+    return catalog
+
+
 class EnhancedFoodDataProcessor:
-    def __init__(self):
-        self.translator = Translator()
-        
-        # Comprehensive food database with nutritional benefits
-        self.food_database = {
-            # Millets
-            'సామలు': {
-                'english': 'Little Millet', 'hindi': 'कुटकी', 'tamil': 'சாமை', 'kannada': 'ಸಾವೆ',
-                'category': 'Millet', 'type': 'Ancient Grain',
-                'benefits': ['High in fiber', 'Gluten-free', 'Rich in iron', 'Good for diabetes', 'Weight management'],
-                'nutrition': {'protein': '7.7g', 'fiber': '7.6g', 'iron': '9.3mg', 'calcium': '17mg'}
-            },
-            'రాగులు': {
-                'english': 'Finger Millet', 'hindi': 'रागी', 'tamil': 'கேழ்வரகு', 'kannada': 'ರಾಗಿ',
-                'category': 'Millet', 'type': 'Ancient Grain',
-                'benefits': ['High calcium', 'Rich in amino acids', 'Good for bones', 'Natural relaxant', 'Anti-aging'],
-                'nutrition': {'protein': '7.3g', 'fiber': '3.6g', 'calcium': '344mg', 'iron': '3.9mg'}
-            },
-            'వరగు': {
-                'english': 'Proso Millet', 'hindi': 'चीना', 'tamil': 'வரகு', 'kannada': 'ವರಗು',
-                'category': 'Millet', 'type': 'Ancient Grain',
-                'benefits': ['Easy to digest', 'Low glycemic index', 'Antioxidant properties', 'Heart healthy'],
-                'nutrition': {'protein': '11.0g', 'fiber': '8.5g', 'magnesium': '153mg', 'phosphorus': '206mg'}
-            },
-            'కొర్రలు': {
-                'english': 'Foxtail Millet', 'hindi': 'कंगनी', 'tamil': 'தினை', 'kannada': 'ನವಣೆ',
-                'category': 'Millet', 'type': 'Ancient Grain',
-                'benefits': ['Blood sugar control', 'Heart health', 'Weight loss', 'Rich in protein'],
-                'nutrition': {'protein': '12.3g', 'fiber': '8.0g', 'iron': '2.8mg', 'zinc': '2.4mg'}
-            },
-            'అరికేలు': {
-                'english': 'Kodo Millet', 'hindi': 'कोदो', 'tamil': 'வரகு', 'kannada': 'ಹಾರಕ',
-                'category': 'Millet', 'type': 'Ancient Grain',
-                'benefits': ['High antioxidants', 'Reduces cholesterol', 'Good for liver', 'Anti-diabetic'],
-                'nutrition': {'protein': '8.3g', 'fiber': '9.0g', 'iron': '0.5mg', 'calcium': '27mg'}
-            },
-            'బజ్రా': {
-                'english': 'Pearl Millet', 'hindi': 'बाजरा', 'tamil': 'கம்பு', 'kannada': 'ಸಜ್ಜೆ',
-                'category': 'Millet', 'type': 'Ancient Grain',
-                'benefits': ['High energy', 'Rich in iron', 'Prevents anemia', 'Good for heart'],
-                'nutrition': {'protein': '11.6g', 'fiber': '1.2g', 'iron': '8.0mg', 'magnesium': '137mg'}
-            },
-            
-            # Pulses/Dals
-            'కంది పప్పు': {
-                'english': 'Toor Dal', 'hindi': 'तूर दाल', 'tamil': 'துவரம் பருப்பு', 'kannada': 'ತೊಗರಿ ಬೇಳೆ',
-                'category': 'Pulse', 'type': 'Legume',
-                'benefits': ['High protein', 'Rich in folate', 'Heart healthy', 'Lowers cholesterol', 'Good for digestion'],
-                'nutrition': {'protein': '22.3g', 'fiber': '15.5g', 'folate': '449mcg', 'potassium': '1392mg'}
-            },
-            'పెసర పప్పు': {
-                'english': 'Moong Dal', 'hindi': 'मूंग दाल', 'tamil': 'பயத்தம் பருப்பு', 'kannada': 'ಹೆಸರು ಕಾಳು',
-                'category': 'Pulse', 'type': 'Legume',
-                'benefits': ['Easy to digest', 'Cooling effect', 'Rich in antioxidants', 'Weight loss', 'Skin health'],
-                'nutrition': {'protein': '24.0g', 'fiber': '16.3g', 'folate': '625mcg', 'magnesium': '189mg'}
-            },
-            'మినప పప్పు': {
-                'english': 'Urad Dal', 'hindi': 'उड़द दाल', 'tamil': 'உழுந்து', 'kannada': 'ಮಾಷ್ ಪರಿಪ್ಪು',
-                'category': 'Pulse', 'type': 'Legume',
-                'benefits': ['High protein', 'Good for bones', 'Improves digestion', 'Boosts energy', 'Rich in iron'],
-                'nutrition': {'protein': '25.2g', 'fiber': '18.3g', 'iron': '7.6mg', 'calcium': '138mg'}
-            },
-            'శనగ పప్పు': {
-                'english': 'Chana Dal', 'hindi': 'चना दाल', 'tamil': 'கடலை பருப்பு', 'kannada': 'ಕಡಲೆ ಕಾಳು',
-                'category': 'Pulse', 'type': 'Legume',
-                'benefits': ['High fiber', 'Blood sugar control', 'Heart health', 'Weight management', 'Rich in protein'],
-                'nutrition': {'protein': '20.1g', 'fiber': '30.5g', 'folate': '557mcg', 'manganese': '1.7mg'}
-            },
-            'మసూర పప్పు': {
-                'english': 'Masoor Dal', 'hindi': 'मसूर दाल', 'tamil': 'மசூர் பருப்பு', 'kannada': 'ಮಸೂರ್ ದಾಲ್',
-                'category': 'Pulse', 'type': 'Legume',
-                'benefits': ['High protein', 'Rich in iron', 'Good for heart', 'Weight loss', 'Improves immunity'],
-                'nutrition': {'protein': '25.8g', 'fiber': '11.5g', 'iron': '6.6mg', 'folate': '479mcg'}
-            },
-            
-            # Grains
-            'గోధుమ': {
-                'english': 'Wheat', 'hindi': 'गेहूं', 'tamil': 'கோதுமை', 'kannada': 'ಗೋಧಿ',
-                'category': 'Grain', 'type': 'Cereal',
-                'benefits': ['High fiber', 'Good for digestion', 'Energy source', 'B vitamins', 'Heart health'],
-                'nutrition': {'protein': '11.8g', 'fiber': '12.2g', 'iron': '5.4mg', 'zinc': '4.2mg'}
-            },
-            'బియ్యం': {
-                'english': 'Rice', 'hindi': 'चावल', 'tamil': 'அரிசி', 'kannada': 'ಅಕ್ಕಿ',
-                'category': 'Grain', 'type': 'Cereal',
-                'benefits': ['Easy to digest', 'Gluten-free', 'Energy source', 'Low sodium', 'Quick energy'],
-                'nutrition': {'protein': '6.8g', 'fiber': '0.4g', 'thiamine': '0.07mg', 'niacin': '1.6mg'}
-            },
-            'క్వినోవా': {
-                'english': 'Quinoa', 'hindi': 'क्विनोआ', 'tamil': 'க்வினோவா', 'kannada': 'ಕ್ವಿನೋವಾ',
-                'category': 'Grain', 'type': 'Pseudocereal',
-                'benefits': ['Complete protein', 'Gluten-free', 'High fiber', 'Rich in minerals', 'Antioxidants'],
-                'nutrition': {'protein': '14.1g', 'fiber': '7.0g', 'iron': '4.6mg', 'magnesium': '197mg'}
-            },
-            'వోట్స్': {
-                'english': 'Oats', 'hindi': 'ओट्स', 'tamil': 'ஓட்ஸ்', 'kannada': 'ಓಟ್ಸ್',
-                'category': 'Grain', 'type': 'Cereal',
-                'benefits': ['Lowers cholesterol', 'Heart health', 'Weight management', 'Stable blood sugar', 'High fiber'],
-                'nutrition': {'protein': '16.9g', 'fiber': '10.6g', 'manganese': '4.9mg', 'phosphorus': '523mg'}
-            },
-            
-            # Spices & Seeds
-            'మెంతులు': {
-                'english': 'Fenugreek', 'hindi': 'मेथी', 'tamil': 'வெந்தயம்', 'kannada': 'ಮೆಂತ್ಯ',
-                'category': 'Spice', 'type': 'Seed',
-                'benefits': ['Blood sugar control', 'Digestive health', 'Anti-inflammatory', 'Cholesterol reduction'],
-                'nutrition': {'protein': '23.0g', 'fiber': '24.6g', 'iron': '33.5mg', 'magnesium': '191mg'}
-            },
-            'జిలకర్ర': {
-                'english': 'Cumin', 'hindi': 'जीरा', 'tamil': 'சீரகம்', 'kannada': 'ಜೀರಿಗೆ',
-                'category': 'Spice', 'type': 'Seed',
-                'benefits': ['Improves digestion', 'Rich in iron', 'Antioxidant properties', 'Weight loss'],
-                'nutrition': {'protein': '17.8g', 'fiber': '10.5g', 'iron': '66.4mg', 'calcium': '931mg'}
-            },
-            'నువ్వులు': {
-                'english': 'Sesame Seeds', 'hindi': 'तिल', 'tamil': 'எள்', 'kannada': 'ಎಳ್ಳು',
-                'category': 'Seeds', 'type': 'Oilseed',
-                'benefits': ['High calcium', 'Healthy fats', 'Bone health', 'Heart health', 'Skin health'],
-                'nutrition': {'protein': '17.7g', 'fiber': '11.8g', 'calcium': '975mg', 'magnesium': '351mg'}
-            },
-            'చియా సీడ్స్': {
-                'english': 'Chia Seeds', 'hindi': 'चिया सीड', 'tamil': 'சியா விதைகள்', 'kannada': 'ಚಿಯಾ ಬೀಜಗಳು',
-                'category': 'Seeds', 'type': 'Superfood',
-                'benefits': ['Omega-3 fatty acids', 'High fiber', 'Protein rich', 'Antioxidants', 'Weight management'],
-                'nutrition': {'protein': '16.5g', 'fiber': '34.4g', 'omega3': '17.8g', 'calcium': '631mg'}
-            }
-        }
-        
-        # Phonetic mapping for search
-        self.phonetic_mappings = {
-            'samalu': 'సామలు', 'ragulu': 'రాగులు', 'varagu': 'వరగు', 'korralu': 'కొర్రలు',
-            'arikelu': 'అరికేలు', 'bajra': 'బజ్రా', 'kandi pappu': 'కంది పప్పు',
-            'pesara pappu': 'పెసర పప్పు', 'minapa pappu': 'మినప పప్పు',
-            'shanaga pappu': 'శనగ పప్పు', 'masoor pappu': 'మసూర పప్పు',
-            'godhuma': 'గోధుమ', 'biyyam': 'బియ్యం', 'quinoa': 'క్వినోవా',
-            'oats': 'వోట్స్', 'menthulu': 'మెంతులు', 'jilakarra': 'జిలకర్ర',
-            'nuvvulu': 'నువ్వులు', 'chia seeds': 'చియా సీడ్స్'
-        }
+    def __init__(self, catalog_path=DEFAULT_CATALOG_PATH, catalog=None, cache_size=1024, cache_ttl=None,
+                 metrics=False, shards=0):
+        self.phonetic_mappings = PHONETIC_MAPPINGS
+        # Search instrumentation; self.metrics is None while switched off
+        self._metrics_store = None
+        self.enable_metrics(metrics)
+        # Results keyed on (kind, normalized query); a new catalog version clears it
+        self.result_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        # Comprehensive food database with nutritional benefits, read once per process
+        self.catalog_path = catalog_path
+        self.indexes = CatalogIndexes(_versioned(catalog if catalog is not None else load_catalog(catalog_path)),
+                                      self.phonetic_mappings)
+        self.result_cache.set_version(self.indexes.catalog.version)
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        # Optional pool of search shard processes for the current catalog (see sharding.py)
+        self.shards = shards
+        self._sharded = self._start_shards(self.indexes) if shards else None
+        self._restarting = False
+
+    # The current catalog and its indexes; all of them change together on reload
+    catalog = property(lambda self: self.indexes.catalog)
+    food_database = property(lambda self: self.indexes.food_database)
+    nutrient_matrix = property(lambda self: self.indexes.nutrient_matrix)
+    nutrient_index = property(lambda self: self.indexes.nutrient_index)
+    meal_planner = property(lambda self: self.indexes.meal_planner)
+
+    def reload(self, catalog=None):
+        """Swap in a new catalog (re-read from catalog_path by default); returns the rebuilt index groups
+
+        Indexes are built off to the side, reusing every group the changes do not touch,
+        then published with a single attribute assignment. Calls already running finish
+        on the indexes they started with; nothing waits for the rebuild.
+        """
+        with self._reload_lock:
+            catalog = catalog if catalog is not None else load_catalog(self.catalog_path)
+            if catalog is self.indexes.catalog:
+                return []
+            indexes = CatalogIndexes(_versioned(catalog), self.phonetic_mappings, previous=self.indexes)
+            previous_shards = self._sharded
+            self._sharded = self._start_shards(indexes) if self.shards else None
+            self.indexes = indexes
+            self.result_cache.set_version(catalog.version)
+        if previous_shards is not None:
+            previous_shards.close()
+        logger.info(f"Reloaded {len(catalog)} foods (rebuilt: {', '.join(indexes.rebuilt) or 'nothing'})")
+        return list(indexes.rebuilt)
+
+    def watch_catalog(self, interval=1.0):
+        """Reload automatically whenever the catalog file changes (polled every interval seconds)"""
+        if self.catalog_path is None:
+            raise ValueError("Processor was not loaded from a catalog file")
+        if self._watcher is None:
+            self._watcher = CatalogWatcher(self.catalog_path, lambda path: self.reload(load_catalog(path)),
+                                           interval=interval, version=self.catalog.version)
+            self._watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        """Stop the watcher started by watch_catalog"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _start_shards(self, indexes):
+        """Shard pool for a catalog's indexes, mapping the catalog file directly when it is that catalog's snapshot"""
+        snapshot_path = None
+        try:
+            if self.catalog_path is not None and file_version(self.catalog_path) == indexes.catalog.version:
+                snapshot_path = self.catalog_path
+        except OSError:
+            pass
+        return ShardedSearch(indexes, shards=self.shards, snapshot_path=snapshot_path)
+
+    def _restart_shards(self, sharded):
+        """Replace a broken shard pool in the background once SHARD_RESTART_BACKOFF seconds have passed
+
+        Calls search in-process meanwhile. A pool that fails to start stays broken, and
+        the next call that finds it so schedules another attempt.
+        """
+        with self._reload_lock:
+            if not sharded.broken or self._sharded is not sharded or self._restarting:
+                return
+            self._restarting = True
+
+        def restart():
+            time.sleep(SHARD_RESTART_BACKOFF)
+            try:
+                with self._reload_lock:
+                    # Unless a reload or close replaced the pool meanwhile
+                    if self._sharded is sharded:
+                        self._sharded = self._start_shards(sharded.indexes)
+                        logger.info("Restarted search shards after a failure")
+            except Exception:
+                logger.exception("Restarting search shards failed")
+            finally:
+                self._restarting = False
+            sharded.close()
+
+        threading.Thread(target=restart, name="shard-restart", daemon=True).start()
+
+    def close(self):
+        """Stop the catalog watcher and any search shard processes"""
+        self.stop_watching()
+        with self._reload_lock:
+            sharded, self._sharded = self._sharded, None
+        if sharded is not None:
+            sharded.close()
 
     def search_food_item(self, query):
         """Search for food item by any name (English, Telugu, Hindi, phonetic)"""
-        query = query.lower().strip()
+        return list(self._search(normalize_query(query), self.indexes))
+
+    def _search(self, query, indexes):
+        """Cached search of a normalized query against one set of indexes"""
+        metrics = self.metrics
+        if metrics is None:
+            return self.result_cache.get_or_compute(
+                ('search', query), lambda: tuple(self._search_food_item(query, indexes)),
+                version=indexes.catalog.version
+            )
+
+        computed = []
+        start = time.perf_counter()
+        results = self.result_cache.get_or_compute(
+            ('search', query), lambda: computed.append(1) or tuple(self._search_food_item(query, indexes, metrics)),
+            version=indexes.catalog.version
+        )
+        metrics.record_search(time.perf_counter() - start, len(results), cached=not computed)
+        return results
+
+    def search_food_items(self, queries):
+        """Search many names at once; with shards, uncached names go out in one scatter-gather round"""
+        indexes = self.indexes
+        keys = [normalize_query(query) for query in queries]
+        sharded = self._sharded
+        if sharded is None or sharded.catalog is not indexes.catalog:
+            return [list(self._search(key, indexes)) for key in keys]
+
+        # One cache lookup per distinct name; the misses are searched together
+        metrics = self.metrics
+        start = time.perf_counter()
+        version = indexes.catalog.version
+        found, missing = {}, []
+        for key in dict.fromkeys(keys):
+            results = self.result_cache.get(('search', key), version=version)
+            if results is None:
+                missing.append(key)
+            else:
+                found[key] = results
+        round_trip = time.perf_counter()
+        try:
+            batches = sharded.search_many(missing)
+            if metrics is not None and missing:
+                metrics.record_stage('sharded', time.perf_counter() - round_trip, sum(map(len, batches)))
+        except RuntimeError:
+            # Shards replaced by a reload mid-call, or broken; search locally
+            self._restart_shards(sharded)
+            batches = [self._search_food_item(key, indexes, metrics) for key in missing]
+        cached = set(found)
+        for key, results in zip(missing, batches):
+            found[key] = tuple(results)
+            self.result_cache.put(('search', key), found[key], version=version)
+        if metrics is not None and found:
+            # Names in a batch share its latency evenly
+            seconds = (time.perf_counter() - start) / len(found)
+            for key, results in found.items():
+                metrics.record_search(seconds, len(results), cached=key in cached)
+        return [list(found[key]) for key in keys]
+
+    def _search_food_item(self, query, indexes, metrics=None):
+        """Uncached search pipeline for an already normalized query"""
+        sharded = self._sharded
+        if sharded is not None and sharded.catalog is indexes.catalog:
+            start = time.perf_counter()
+            try:
+                results = sharded.search(query)
+            except RuntimeError:
+                self._restart_shards(sharded)  # replaced by a reload mid-call, or broken; search locally
+            else:
+                if metrics is not None:
+                    metrics.record_stage('sharded', time.perf_counter() - start, len(results))
+                return results
         results = []
-        
-        # Direct search in database
-        for telugu_name, data in self.food_database.items():
-            # Check all possible matches
-            if (query in data['english'].lower() or 
-                query in data['hindi'] or 
-                query in telugu_name or
-                query in str(data.get('tamil', '')).lower() or
-                query in str(data.get('kannada', '')).lower()):
-                results.append((telugu_name, data))
-        
-        # Phonetic search
-        for phonetic, telugu in self.phonetic_mappings.items():
-            if query in phonetic and telugu in self.food_database:
-                if (telugu, self.food_database[telugu]) not in results:
-                    results.append((telugu, self.food_database[telugu]))
-        
-        # Fuzzy search if no exact matches
-        if not results:
-            all_names = []
-            for telugu_name, data in self.food_database.items():
-                all_names.extend([data['english'].lower(), telugu_name, data['hindi']])
-            
-            fuzzy_matches = process.extract(query, all_names, limit=3, scorer=fuzz.ratio)
-            for match, score in fuzzy_matches:
-                if score > 70:  # 70% similarity threshold
-                    for telugu_name, data in self.food_database.items():
-                        if (match in [data['english'].lower(), telugu_name, data['hindi']] and
-                            (telugu_name, data) not in results):
-                            results.append((telugu_name, data))
-        
+        seen = set()
+        for stage, find in (('direct', self._direct_matches), ('phonetic', self._phonetic_matches),
+                            ('fuzzy', self._fuzzy_matches)):
+            # Fuzzy search only if no exact matches
+            if stage == 'fuzzy' and results:
+                break
+            if metrics is None:
+                find(query, indexes, results, seen)
+                continue
+            found = len(results)
+            start = time.perf_counter()
+            find(query, indexes, results, seen, metrics)
+            metrics.record_stage(stage, time.perf_counter() - start, len(results) - found)
         return results
 
+    @staticmethod
+    def _direct_matches(query, indexes, results, seen, metrics=None):
+        # Direct search in database (ids come back in database order)
+        for doc_id in indexes.name_index.search(query):
+            telugu_name = indexes.food_keys[doc_id]
+            seen.add(telugu_name)
+            results.append((telugu_name, indexes.food_database[telugu_name]))
+
+    @staticmethod
+    def _phonetic_matches(query, indexes, results, seen, metrics=None):
+        # Phonetic search
+        for doc_id in indexes.phonetic_index.search(query):
+            telugu = indexes.phonetic_mappings[indexes.phonetic_keys[doc_id]]
+            if telugu in indexes.food_database and telugu not in seen:
+                seen.add(telugu)
+                results.append((telugu, indexes.food_database[telugu]))
+
+        # Transliterated phonetic search (e.g. 'Raagulu' -> 'రాగులు'), only when nothing else matched
+        if results:
+            return
+        for telugu in indexes.phonetic_key_index.get(phonetic_key(query), ()):
+            seen.add(telugu)
+            results.append((telugu, indexes.food_database[telugu]))
+
+    @staticmethod
+    def _fuzzy_matches(query, indexes, results, seen, metrics=None):
+        # Names first; only when none is close, the query's phonetic key against the catalog's keys
+        matches = indexes.fuzzy_matcher.match(query, metrics=metrics)
+        if not matches:
+            keyed = dict.fromkeys(name for _, _, items in indexes.key_matches(query, metrics) for name in items)
+            matches = list(keyed)[:indexes.key_matcher.limit]
+        for telugu_name in matches:
+            if telugu_name not in seen:
+                seen.add(telugu_name)
+                results.append((telugu_name, indexes.food_database[telugu_name]))
+
+    def enable_metrics(self, enabled=True):
+        """Switch search instrumentation on (keeping collected data) or off (no per-search cost)"""
+        if enabled and self._metrics_store is None:
+            self._metrics_store = SearchMetrics()
+        self.metrics = self._metrics_store if enabled else None
+
+    def search_stats(self):
+        """Per-stage search timings and counters, or just {"enabled": False} if never switched on"""
+        if self._metrics_store is None:
+            return {"enabled": False}
+        return {"enabled": self.metrics is not None, **self._metrics_store.stats()}
+
+    def metrics_text(self):
+        """Search metrics and cache statistics in the Prometheus text format"""
+        lines = [] if self._metrics_store is None else [self._metrics_store.prometheus()]
+        cache = self.result_cache.stats()
+        for name in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+            lines.append(f"# TYPE milletmitra_cache_{name}_total counter\nmilletmitra_cache_{name}_total {cache[name]}\n")
+        lines.append(f"# TYPE milletmitra_cache_size gauge\nmilletmitra_cache_size {cache['size']}\n")
+        return ''.join(lines)
+
+    def autocomplete(self, prefix, limit=8):
+        """Ranked suggestions for a partially typed name in any script or phonetic spelling
+
+        Each suggestion is {"telugu", "english", "hindi", "match"}, where match is the
+        name variant that completed the prefix; nothing is rebuilt per call.
+        """
+        query = normalize_query(prefix)
+        if not query:
+            return []
+        indexes = self.indexes
+        matches = indexes.prefix_index.top(query, limit)
+        key = phonetic_key(query)
+        # A trailing short vowel may still be folded once more letters follow ('ari' -> 'arakalu'); drop it
+        if len(key) > 1 and key[-1] in 'aeiu':
+            key = key[:-1]
+        if key:
+            matches.extend(indexes.phonetic_prefix_index.top(key, limit))
+        matches.sort(key=lambda match: match[0])
+
+        suggestions, seen = [], set()
+        for _, telugu_name, label in matches:
+            if telugu_name not in seen:
+                seen.add(telugu_name)
+                data = indexes.food_database[telugu_name]
+                suggestions.append({"telugu": telugu_name, "english": data['english'], "hindi": data['hindi'],
+                                    "match": label})
+                if len(suggestions) == limit:
+                    break
+        return suggestions
+
     def get_food_info(self, food_name):
         """Get comprehensive information about a food item"""
-        results = self.search_food_item(food_name)
-        
-        if not results:
+        food_info = self._resolve_food_info(food_name)
+        if food_info is None:
             return {"error": f"No information found for '{food_name}'"}
-        
-        food_info = []
-        for telugu_name, data in results:
-            info = {
-                "telugu": telugu_name,
-                "english": data['english'],
-                "hindi": data['hindi'],
-                "tamil": data.get('tamil', 'N/A'),
-                "kannada": data.get('kannada', 'N/A'),
-                "category": data['category'],
-                "type": data['type'],
-                "health_benefits": data['benefits'],
-                "nutrition_per_100g": data['nutrition'],
-                "retail_display": f"{data['english']} - {data['hindi']} - {telugu_name}"
-            }
-            food_info.append(info)
-        
         return food_info
 
+    def _resolve_food_info(self, food_name):
+        """Info dicts for every match of a name, or None when nothing matches
+
+        Each caller gets its own copies of the cached dicts, free to modify.
+        """
+        query = normalize_query(food_name)
+        indexes = self.indexes
+
+        def resolve():
+            results = self._search(query, indexes)
+            if not results:
+                return None
+            return tuple(self._food_info(telugu_name, data) for telugu_name, data in results)
+
+        food_info = self.result_cache.get_or_compute(('info', query), resolve, version=indexes.catalog.version)
+        if food_info is None:
+            return None
+        return [{**info, "health_benefits": list(info["health_benefits"]),
+                 "nutrition_per_100g": dict(info["nutrition_per_100g"])} for info in food_info]
+
+    def cache_stats(self):
+        """Hit/miss/eviction statistics of the shared result cache"""
+        return self.result_cache.stats()
+
+    def _food_info(self, telugu_name, data):
+        return {
+            "telugu": telugu_name,
+            "english": data['english'],
+            "hindi": data['hindi'],
+            "tamil": data.get('tamil', 'N/A'),
+            "kannada": data.get('kannada', 'N/A'),
+            "category": data['category'],
+            "type": data['type'],
+            "health_benefits": list(data['benefits']),
+            "nutrition_per_100g": dict(data['nutrition']),
+            "retail_display": f"{data['english']} - {data['hindi']} - {telugu_name}"
+        }
+
+    def iter_food_info_batch(self, names, workers=None, window=1024):
+        """Yield (name, info) in input order, with info None for unmatched names
+
+        Names are normalized and each distinct one is resolved once; with workers set,
+        lookups run on a thread pool while at most window results wait to be yielded.
+        """
+        resolved = {}
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=workers) if workers else None
+        try:
+            for name in names:
+                key = normalize_query(name)
+                if key not in resolved:
+                    if executor is not None:
+                        resolved[key] = executor.submit(self._resolve_food_info, key)
+                    else:
+                        resolved[key] = self._resolve_food_info(key)
+                pending.append((name, key))
+                while len(pending) > (window if executor is not None else 0):
+                    yield self._pop_resolved(pending, resolved)
+            while pending:
+                yield self._pop_resolved(pending, resolved)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _pop_resolved(pending, resolved):
+        name, key = pending.popleft()
+        info = resolved[key]
+        if hasattr(info, 'result'):
+            info = resolved[key] = info.result()
+        return name, info
+
+    def get_food_info_batch(self, names, workers=None):
+        """Resolve a whole list of names (e.g. invoice lines), reporting unmatched names separately"""
+        results = []
+        unmatched = {}
+        for name, info in self.iter_food_info_batch(names, workers=workers):
+            results.append({"query": name, "matches": info or []})
+            if info is None:
+                unmatched.setdefault(normalize_query(name), name)
+        return {"results": results, "unmatched": list(unmatched.values())}
+
+    def _first_matches(self, food_names, indexes):
+        """Best (telugu_name, data) match per name, resolving each distinct name once"""
+        resolved = {}
+        for food_name in food_names:
+            key = normalize_query(food_name)
+            if key not in resolved:
+                results = self._search(key, indexes)
+                resolved[key] = results[0] if results else None
+            yield resolved[key]
+
     def get_category_foods(self, category):
         """Get all foods in a specific category"""
-        category_foods = []
-        for telugu_name, data in self.food_database.items():
-            if data['category'].lower() == category.lower():
-                category_foods.append({
-                    "telugu": telugu_name,
-                    "english": data['english'],
-                    "hindi": data['hindi'],
-                    "benefits": data['benefits'][:3]  # Show top 3 benefits
-                })
-        return category_foods
+        indexes = self.indexes
+        benefit_index = indexes.benefit_index
+        rows = benefit_index.rows(benefit_index.category_bits.get(fold_benefit(category), 0))
+        return [self._browse_entry(indexes.catalog.records[row]) for row in rows]
+
+    @staticmethod
+    def _browse_entry(record):
+        return {
+            "telugu": record.telugu,
+            "english": record.english,
+            "hindi": record.hindi,
+            "benefits": list(record.benefits[:3])  # Show top 3 benefits
+        }
+
+    def browse_foods(self, category=None, food_type=None, benefits=None, cursor=None, page_size=20):
+        """One page of foods in catalog order, with the total and facet counts for the selection
+
+        Pass the returned next_cursor back to get the following page; it is None on the
+        last page. benefits is a boolean expression as accepted by find_foods. Raises
+        ValueError for a bad cursor or expression.
+        """
+        indexes = self.indexes
+        benefit_index = indexes.benefit_index
+        category_key = fold_benefit(category) if category else None
+        type_key = fold_benefit(food_type) if food_type else None
+        extra = benefit_index.query(benefits) if benefits else None
+
+        selection = benefit_index.all_bits if extra is None else extra
+        if category_key is not None:
+            selection &= benefit_index.category_bits.get(category_key, 0)
+        if type_key is not None:
+            selection &= benefit_index.type_bits.get(type_key, 0)
+        rows = benefit_index.rows(selection)
+        page, last = page_rows(rows, indexes.nutrient_matrix.row_of, cursor, max(1, page_size))
+
+        records = indexes.catalog.records
+        return {
+            "foods": [dict(self._browse_entry(records[row]), category=records[row].category,
+                           type=records[row].type) for row in page],
+            "total": len(rows),
+            "next_cursor": None if last is None else encode_cursor(records[last].telugu),
+            "facets": indexes.facets.counts(category_key, type_key, extra)
+        }
+
+    def find_foods(self, expression, limit=None):
+        """Foods matching a boolean benefit query, in catalog order
+
+        Terms are benefits (synonyms fold together, so 'Good for heart' finds 'Heart healthy'),
+        categories or types, combined with AND, OR, NOT and parentheses, e.g.
+        'Gluten-free AND Blood sugar control AND NOT Grain'. Raises ValueError for
+        unknown terms or malformed expressions.
+        """
+        indexes = self.indexes
+        benefit_index = indexes.benefit_index
+        rows = benefit_index.rows(benefit_index.query(expression))
+        results = []
+        for row in rows[:limit]:
+            record = indexes.catalog.records[row]
+            results.append({
+                "telugu": record.telugu,
+                "english": record.english,
+                "category": record.category,
+                "type": record.type,
+                "benefits": list(dict.fromkeys(benefit_index.vocabulary.canonical(b) for b in record.benefits))
+            })
+        return results
+
+    def benefit_counts(self):
+        """Number of foods per canonical benefit, most common first"""
+        return self.indexes.benefit_index.counts()
 
     def create_nutrition_comparison(self, food_names):
         """Compare nutrition of multiple foods"""
         comparison = []
-        for food_name in food_names:
-            results = self.search_food_item(food_name)
-            if results:
-                telugu_name, data = results[0]
+        for match in self._first_matches(food_names, self.indexes):
+            if match:
+                telugu_name, data = match
                 comparison.append({
                     "name": data['english'],
                     "nutrition": data['nutrition']
                 })
         return comparison
 
+    def compare_nutrition_values(self, food_names, reference=None):
+        """Compare foods numerically: normalized values, percent of catalog max and difference vs a reference"""
+        indexes = self.indexes
+        keys = []
+        for match in self._first_matches(food_names, indexes):
+            if match and match[0] not in keys:
+                keys.append(match[0])
+        if not keys:
+            return {}
+
+        matrix = indexes.nutrient_matrix
+        reference_key = keys[0]
+        if reference is not None:
+            results = self._search(normalize_query(reference), indexes)
+            if results:
+                reference_key = results[0][0]
+
+        rows = matrix.rows(keys)
+        # Only nutrients at least one of the compared foods reports
+        cols = np.flatnonzero(matrix.mask[rows].any(axis=0))
+
+        def to_lists(values):
+            return [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in values[:, cols]]
+
+        return {
+            "foods": [indexes.food_database[key]['english'] for key in keys],
+            "telugu": keys,
+            "reference": indexes.food_database[reference_key]['english'],
+            "nutrients": [matrix.nutrients[col] for col in cols],
+            "units": [matrix.units[col] for col in cols],
+            "values": to_lists(matrix.filled(rows)),
+            "percent_of_max": to_lists(matrix.percent_of_max(rows)),
+            "difference": to_lists(matrix.difference_from(matrix.row_of[reference_key], rows))
+        }
+
+    def rank_foods_by_nutrient(self, nutrient, limit=10, descending=True):
+        """Rank the whole catalog by one nutrient (foods without a value are skipped)"""
+        indexes = self.indexes
+        matrix = indexes.nutrient_matrix
+        col = matrix.column(nutrient)
+        ranking = []
+        for row in matrix.rank(nutrient, descending=descending)[:limit]:
+            telugu_name = matrix.food_keys[row]
+            ranking.append({
+                "telugu": telugu_name,
+                "english": indexes.food_database[telugu_name]['english'],
+                "value": float(matrix.values[row, col]),
+                "unit": matrix.units[col]
+            })
+        return ranking
+
+    def _allowed_rows(self, indexes, category=None, food_type=None, benefits=None):
+        """Boolean row mask for category/type/benefit constraints, None if unconstrained"""
+        allowed = None
+        for masks, value in ((indexes.category_masks, category), (indexes.type_masks, food_type)):
+            if value:
+                mask = masks.get(value.lower())
+                if mask is None:
+                    mask = np.zeros(len(indexes.food_keys), dtype=bool)
+                allowed = mask if allowed is None else allowed & mask
+        if benefits:
+            mask = indexes.benefit_index.mask(indexes.benefit_index.query(benefits))
+            allowed = mask if allowed is None else allowed & mask
+        return allowed
+
+    def find_substitutes(self, food_name, k=5, weights=None, category=None, food_type=None, benefits=None):
+        """The k foods nearest to a food in normalized nutrient space
+
+        weights maps nutrients to importance (default 1.0, 0 ignores a nutrient);
+        category may be 'same' to stay within the food's own category; benefits is a
+        boolean expression as accepted by find_foods.
+        """
+        indexes = self.indexes
+        results = self._search(normalize_query(food_name), indexes)
+        if not results:
+            return {"error": f"No information found for '{food_name}'"}
+        telugu_name, data = results[0]
+        if category == 'same':
+            category = data['category']
+
+        matrix = indexes.nutrient_matrix
+        row = matrix.row_of[telugu_name]
+        allowed = self._allowed_rows(indexes, category, food_type, benefits)
+        rows, distances = indexes.nutrient_space.nearest(row, k, weights=weights, allowed=allowed)
+        return {
+            "food": {"telugu": telugu_name, "english": data['english'], "category": data['category']},
+            "substitutes": [self._substitute(indexes, r, d) for r, d in zip(rows, distances)]
+        }
+
+    def substitutes_table(self, k=5, weights=None, same_category=True):
+        """Precompute the k nearest substitutes of every food: {telugu_name: [substitute, ...]}
+
+        All-pairs distances are computed in blocks of rows, per category when
+        same_category is set.
+        """
+        indexes = self.indexes
+        space = indexes.nutrient_space
+        matrix = indexes.nutrient_matrix
+        if same_category:
+            groups = list(indexes.category_masks.values())
+            uncategorized = ~np.logical_or.reduce(groups) if groups else np.ones(len(matrix.food_keys), dtype=bool)
+            groups.append(uncategorized)
+            groups = [np.flatnonzero(mask) for mask in groups]
+        else:
+            groups = [np.arange(len(matrix.food_keys))]
+
+        table = {}
+        for rows in groups:
+            if not len(rows):
+                continue
+            neighbours, distances = space.all_nearest(k, weights=weights, rows=rows, candidates=rows)
+            for row, found, found_distances in zip(rows, neighbours, distances):
+                table[matrix.food_keys[row]] = [
+                    self._substitute(indexes, r, d) for r, d in zip(found, found_distances) if r >= 0
+                ]
+        return {telugu_name: table[telugu_name] for telugu_name in matrix.food_keys}
+
+    @staticmethod
+    def _substitute(indexes, row, distance):
+        telugu_name = indexes.nutrient_matrix.food_keys[row]
+        data = indexes.food_database[telugu_name]
+        return {
+            "telugu": telugu_name,
+            "english": data['english'],
+            "category": data['category'],
+            "type": data['type'],
+            "distance": round(float(distance), 4)
+        }
+
+    def query_foods(self, ranges=None, sort_by=None, limit=10, descending=True,
+                    category=None, food_type=None, benefits=None):
+        """Find foods by nutrient ranges, category, type and benefits, optionally top-k by a nutrient
+
+        ranges maps a nutrient to (low, high) in that nutrient's unit; either end may be None.
+        benefits is a boolean expression as accepted by find_foods.
+        """
+        indexes = self.indexes
+        matrix = indexes.nutrient_matrix
+        allowed = self._allowed_rows(indexes, category, food_type, benefits)
+
+        # Start from the most selective range, then check the others on those rows only
+        ranges = ranges or {}
+        candidates = None
+        for nutrient, (low, high) in ranges.items():
+            rows = indexes.nutrient_index.range(nutrient, low, high)
+            if candidates is None or len(rows) < len(candidates):
+                candidates = rows
+        if candidates is None:
+            if sort_by:
+                rows = indexes.nutrient_index.top_k(sort_by, limit, descending=descending, allowed=allowed)
+            else:
+                rows = np.arange(len(matrix.food_keys)) if allowed is None else np.flatnonzero(allowed)
+                rows = rows[:limit]
+        else:
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            for nutrient, (low, high) in ranges.items():
+                col = matrix.column(nutrient)
+                keep = matrix.mask[candidates, col]
+                values = matrix.values[candidates, col]
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                candidates = candidates[keep]
+            if sort_by:
+                col = matrix.column(sort_by)
+                candidates = candidates[matrix.mask[candidates, col]]
+                values = matrix.values[candidates, col]
+                candidates = candidates[np.argsort(-values if descending else values, kind='stable')]
+            rows = candidates[:limit]
+
+        shown = list(dict.fromkeys(list(ranges) + ([sort_by] if sort_by else [])))
+        cols = [matrix.column(nutrient) for nutrient in shown]
+        results = []
+        for row in rows:
+            telugu_name = matrix.food_keys[row]
+            data = indexes.food_database[telugu_name]
+            results.append({
+                "telugu": telugu_name,
+                "english": data['english'],
+                "category": data['category'],
+                "type": data['type'],
+                "nutrition": {
+                    matrix.nutrients[col]: float(matrix.values[row, col]) if matrix.mask[row, col] else None
+                    for col in cols
+                },
+                "units": {matrix.nutrients[col]: matrix.units[col] for col in cols}
+            })
+        return results
+
     def generate_meal_suggestions(self, dietary_preference="balanced"):
         """Generate meal suggestions based on dietary preferences"""
-        suggestions = {
-            "breakfast": [],
-            "lunch": [],
-            "dinner": [],
-            "snacks": []
+        return self.plan_meals(dietary_preference)["meals"]
+
+    def plan_meals(self, profile="balanced"):
+        """Plan foods and portions for every meal slot to meet a dietary profile's nutrient targets"""
+        indexes = self.indexes
+        return self._format_meal_plan(indexes.meal_planner.plan(profile), indexes)
+
+    def plan_meals_batch(self, profiles):
+        """Plan meals for many profiles (preference strings or dicts) in one vectorized call"""
+        indexes = self.indexes
+        return [self._format_meal_plan(plan, indexes) for plan in indexes.meal_planner.plan_batch(profiles)]
+
+    @staticmethod
+    def _format_meal_plan(plan, indexes):
+        meals = {}
+        for slot, picks in plan["meals"].items():
+            meals[slot] = [{
+                "english": indexes.food_database[food]['english'],
+                "telugu": food,
+                "benefits": list(indexes.food_database[food]['benefits'][:2]),
+                "portion_g": grams
+            } for food, grams in picks]
+        return {
+            "preference": plan["preference"],
+            "meals": meals,
+            "totals": plan["totals"],
+            "targets": plan["targets"]
         }
-        
-        if dietary_preference.lower() == "diabetic":
-            # Low glycemic index foods
-            breakfast_foods = ['రాగులు', 'వరగు', 'వోట్స్']
-            lunch_foods = ['కంది పప్పు', 'పెసర పప్పు', 'సామలు']
-            
-        elif dietary_preference.lower() == "weight_loss":
-            # High fiber, low calorie foods
-            breakfast_foods = ['వోట్స్', 'రాగులు', 'చియా సీడ్స్']
-            lunch_foods = ['పెసర పప్పు', 'క్వినోవా', 'సామలు']
-            
-        else:  # balanced
-            breakfast_foods = ['వోట్స్', 'రాగులు', 'గోధుమ']
-            lunch_foods = ['కంది పప్పు', 'బియ్యం', 'కొర్రలు']
-        
-        for food in breakfast_foods:
-            if food in self.food_database:
-                suggestions["breakfast"].append({
-                    "english": self.food_database[food]['english'],
-                    "telugu": food,
-                    "benefits": self.food_database[food]['benefits'][:2]
-                })
-        
-        for food in lunch_foods:
-            if food in self.food_database:
-                suggestions["lunch"].append({
-                    "english": self.food_database[food]['english'],
-                    "telugu": food,
-                    "benefits": self.food_database[food]['benefits'][:2]
-                })
-        
-        return suggestions
 
     def export_to_json(self, filename="food_database.json"):
         """Export database to JSON for easy sharing"""
         export_data = {}
         for telugu_name, data in self.food_database.items():
-            export_data[telugu_name] = data
+            export_data[telugu_name] = data.to_dict()
         
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(export_data, f, ensure_ascii=False, indent=2)
         
         logger.info(f"Database exported to {filename}")
 
+    def export_snapshot(self, filename="food_database.snap"):
+        """Export database as a memory-mappable snapshot (loadable wherever a catalog path is accepted)"""
+        size = write_snapshot(self.catalog, filename)
+        logger.info(f"Snapshot of {len(self.catalog)} foods ({size} bytes) exported to {filename}")
+
+    def export_to_jsonl(self, filename="food_database.jsonl"):
+        """Stream the database to JSON Lines, one food per line"""
+        count = write_jsonl(self.catalog.records, filename)
+        logger.info(f"{count} foods exported to {filename}")
+
+    def import_changes(self, filename, removed=()):
+        """Apply a JSON Lines file of new or edited foods, rebuilding indexes only if something changed"""
+        current = self.catalog
+        catalog, changes = apply_changes(current, iter_jsonl(filename), removed=removed)
+        if catalog is not current:
+            # A fresh version so cached results from the old catalog are dropped
+            catalog.version = f"{current.version}+{time.time_ns():x}"
+            self.reload(catalog)
+        logger.info(f"Imported {filename}: " + ", ".join(f"{len(v)} {k}" for k, v in changes.items()))
+        return changes
+
     def create_retail_labels(self, food_names):
         """Create retail-style labels for given foods"""
-        labels = []
-        for food_name in food_names:
-            results = self.search_food_item(food_name)
-            if results:
-                telugu_name, data = results[0]
-                
-                # Create attractive retail label
-                label = f"""
-╔══════════════════════════════════════════════════════════════╗
-║  {data['english']:^58} ║
-║  {telugu_name:^58} ║
-║  {data['hindi']:^58} ║
-║                                                              ║
-║  Category: {data['category']:<15} Type: {data['type']:<20} ║
-║                                                              ║
-║  Key Benefits:                                               ║
-"""
-                for i, benefit in enumerate(data['benefits'][:3], 1):
-                    label += f"║  {i}. {benefit:<55} ║\n"
-                
-                label += f"""║                                                              ║
-║  Nutrition Highlights (per 100g):                           ║
-║  Protein: {data['nutrition'].get('protein', 'N/A'):<10} Fiber: {data['nutrition'].get('fiber', 'N/A'):<15} ║
-╚══════════════════════════════════════════════════════════════╝
-"""
-                labels.append(label)
-        
-        return labels
+        return list(self.iter_retail_labels(food_names))
+
+    def iter_retail_labels(self, food_names, workers=None):
+        """Stream retail labels in input order (unmatched names are skipped)"""
+        fields = (
+            label_fields(*results[0])
+            for results in map(self.search_food_item, food_names)
+            if results
+        )
+        return render_labels(fields, workers=workers)
+
+    def write_retail_labels(self, food_names, output, workers=None):
+        """Write labels for any number of foods to a path or text stream; returns the label count"""
+        if isinstance(output, str):
+            with open(output, 'w', encoding='utf-8') as f:
+                return self.write_retail_labels(food_names, f, workers=workers)
+        count = 0
+        for label in self.iter_retail_labels(food_names, workers=workers):
+            output.write(label)
+            output.write('\n')
+            count += 1
+        logger.info(f"Wrote {count} retail labels")
+        return count
 
 def main():
     """Interactive demo of the enhanced food processor"""
@@ -356,7 +833,8 @@ def main():
                     print(f"   Key Nutrition: {item['nutrition_per_100g']}")
         
         elif choice == "2":
-            category = input("Enter category (Millet/Pulse/Grain/Spice/Seeds): ").strip()
+            categories = '/'.join(processor.browse_foods(page_size=1)["facets"]["category"])
+            category = input(f"Enter category ({categories}): ").strip()
             foods = processor.get_category_foods(category)
             
             if foods:
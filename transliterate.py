@@ -0,0 +1,303 @@
+import unicodedata
+
+# Unicode block bases of the ISCII-derived Indic scripts; letters share offsets
+SCRIPT_BASES = {
+    'devanagari': 0x0900,
+    'tamil': 0x0B80,
+    'telugu': 0x0C00,
+    'kannada': 0x0C80,
+}
+
+VOWELS = {
+    0x05: 'a', 0x06: 'aa', 0x07: 'i', 0x08: 'ii', 0x09: 'u', 0x0A: 'uu', 0x0B: 'ri',
+    0x0D: 'e', 0x0E: 'e', 0x0F: 'ee', 0x10: 'ai', 0x11: 'o', 0x12: 'o', 0x13: 'oo', 0x14: 'au'
+}
+VOWEL_SIGNS = {
+    0x3E: 'aa', 0x3F: 'i', 0x40: 'ii', 0x41: 'u', 0x42: 'uu', 0x43: 'ri', 0x44: 'ri',
+    0x45: 'e', 0x46: 'e', 0x47: 'ee', 0x48: 'ai', 0x49: 'o', 0x4A: 'o', 0x4B: 'oo', 0x4C: 'au'
+}
+CONSONANTS = {
+    0x15: 'k', 0x16: 'kh', 0x17: 'g', 0x18: 'gh', 0x19: 'ng',
+    0x1A: 'c', 0x1B: 'ch', 0x1C: 'j', 0x1D: 'jh', 0x1E: 'ny',
+    0x1F: 'T', 0x20: 'Th', 0x21: 'D', 0x22: 'Dh', 0x23: 'N',
+    0x24: 't', 0x25: 'th', 0x26: 'd', 0x27: 'dh', 0x28: 'n', 0x29: 'n',
+    0x2A: 'p', 0x2B: 'ph', 0x2C: 'b', 0x2D: 'bh', 0x2E: 'm',
+    0x2F: 'y', 0x30: 'r', 0x31: 'R', 0x32: 'l', 0x33: 'L', 0x34: 'zh', 0x35: 'v',
+    0x36: 'sh', 0x37: 'S', 0x38: 's', 0x39: 'h',
+    # Devanagari precomposed nukta letters
+    0x58: 'q', 0x59: 'kh', 0x5A: 'g', 0x5B: 'z', 0x5C: 'D', 0x5D: 'D', 0x5E: 'f', 0x5F: 'y'
+}
+NUKTA_FORMS = {'k': 'q', 'j': 'z', 'ph': 'f', 'D': 'D', 'Dh': 'D'}
+ANUSVARA = (0x01, 0x02)
+VISARGA = 0x03
+NUKTA = 0x3C
+VIRAMA = 0x4D
+
+# Greedy Latin spelling rules, longest first
+LATIN_RULES = {
+    'chh': ['ch'],
+    'aa': ['aa'], 'ai': ['ai'], 'au': ['au'], 'ee': ['ii'], 'ii': ['ii'], 'oo': ['uu'], 'uu': ['uu'],
+    'kh': ['kh'], 'gh': ['gh'], 'ch': ['c'], 'jh': ['jh'], 'th': ['th'], 'dh': ['dh'],
+    'ph': ['ph'], 'bh': ['bh'], 'sh': ['sh'], 'zh': ['zh'],
+    'a': ['a'], 'e': ['e'], 'i': ['i'], 'o': ['o'], 'u': ['u'],
+    'b': ['b'], 'c': ['k'], 'd': ['d'], 'f': ['f'], 'g': ['g'], 'h': ['h'], 'j': ['j'],
+    'k': ['k'], 'l': ['l'], 'm': ['m'], 'n': ['n'], 'p': ['p'], 'q': ['k'], 'r': ['r'],
+    's': ['s'], 't': ['t'], 'v': ['v'], 'w': ['v'], 'x': ['k', 's'], 'y': ['y'], 'z': ['z']
+}
+LATIN_RULE_LENGTHS = sorted({len(rule) for rule in LATIN_RULES}, reverse=True)
+
+VOWEL_PHONEMES = set(VOWELS.values())
+CONSONANT_PHONEMES = set(CONSONANTS.values())
+
+# Canonical key: aspiration, voicing, vowel length and retroflexion are folded
+KEY_FOLD = {
+    'a': 'a', 'aa': 'a', 'i': 'i', 'ii': 'i', 'u': 'u', 'uu': 'u', 'ri': 'ri',
+    'e': 'e', 'ee': 'e', 'ai': 'e', 'o': 'o', 'oo': 'o', 'au': 'o',
+    'k': 'k', 'kh': 'k', 'g': 'k', 'gh': 'k', 'q': 'k',
+    'c': 'j', 'ch': 'j', 'j': 'j', 'jh': 'j', 'z': 'j',
+    'T': 'd', 'Th': 'd', 'D': 'd', 'Dh': 'd', 't': 'd', 'th': 'd', 'd': 'd', 'dh': 'd',
+    'ng': 'n', 'ny': 'n', 'N': 'n', 'n': 'n', 'M': 'n', 'm': 'm',
+    'p': 'b', 'ph': 'b', 'b': 'b', 'bh': 'b', 'f': 'b',
+    'y': 'y', 'r': 'r', 'R': 'r', 'l': 'l', 'L': 'l', 'zh': 'l', 'v': 'v',
+    'sh': 's', 'S': 's', 's': 's', 'h': 'h', 'H': 'h'
+}
+
+# Short vowels whose quality is folded away between consonants in keys
+KEY_WEAK_VOWELS = {'a', 'e', 'i', 'u'}
+# Letters (and the word break) of a key that are not consonants or digits
+KEY_VOWEL_LETTERS = set('aeiou ')
+
+# Nearest available letter when a script lacks a phoneme
+SCRIPT_FALLBACKS = {
+    'devanagari': {},
+    'telugu': {'q': 'k', 'z': 'j', 'f': 'ph'},
+    'kannada': {'q': 'k', 'z': 'j', 'f': 'ph', 'zh': 'L'},
+    'tamil': {
+        'kh': 'k', 'g': 'k', 'gh': 'k', 'q': 'k', 'ch': 'c', 'jh': 'j', 'z': 'j',
+        'Th': 'T', 'D': 'T', 'Dh': 'T', 'th': 't', 'd': 't', 'dh': 't',
+        'ph': 'p', 'b': 'p', 'bh': 'p', 'f': 'p'
+    },
+}
+DEVANAGARI_NUKTA_BASES = {'q': 'k', 'z': 'j', 'f': 'ph'}
+
+_CONSONANT_OFFSETS = {}
+for _offset, _phoneme in CONSONANTS.items():
+    if _offset < 0x58:
+        _CONSONANT_OFFSETS.setdefault(_phoneme, _offset)
+_VOWEL_OFFSETS = {'a': 0x05, 'aa': 0x06, 'i': 0x07, 'ii': 0x08, 'u': 0x09, 'uu': 0x0A,
+                  'ri': 0x0B, 'e': 0x0E, 'ee': 0x0F, 'ai': 0x10, 'o': 0x12, 'oo': 0x13, 'au': 0x14}
+_SIGN_OFFSETS = {'aa': 0x3E, 'i': 0x3F, 'ii': 0x40, 'u': 0x41, 'uu': 0x42, 'ri': 0x43,
+                 'e': 0x46, 'ee': 0x47, 'ai': 0x48, 'o': 0x4A, 'oo': 0x4B, 'au': 0x4C}
+# Devanagari writes the plain e/o with the letters Dravidian scripts use for long e/o
+_DEVANAGARI_VOWEL_SHIFTS = {'e': 'ee', 'o': 'oo'}
+
+
+def _script_of(char):
+    """Return the Indic script a character belongs to, or None"""
+    cp = ord(char)
+    for script, base in SCRIPT_BASES.items():
+        if base <= cp < base + 0x80:
+            return script
+    return None
+
+
+def _delete_schwas(tokens):
+    """Drop the inherent vowels (marked '@') that Hindi leaves silent"""
+    keep = [True] * len(tokens)
+    if len(tokens) > 2 and tokens[-1] == '@':
+        keep[-1] = False
+
+    def vowel_at(i):
+        return 0 <= i < len(tokens) and keep[i] and (tokens[i] == '@' or tokens[i] in VOWEL_PHONEMES)
+
+    def consonant_at(i):
+        return 0 <= i < len(tokens) and tokens[i] in CONSONANT_PHONEMES
+
+    # Right to left, delete a schwa in a V C _ C V context
+    for i in range(len(tokens) - 3, 1, -1):
+        if (tokens[i] == '@' and vowel_at(i - 2) and consonant_at(i - 1)
+                and consonant_at(i + 1) and vowel_at(i + 2)):
+            keep[i] = False
+
+    return ['a' if token == '@' else token for token, kept in zip(tokens, keep) if kept]
+
+
+def _parse_indic(run, script):
+    """Convert a run of one Indic script into phoneme tokens"""
+    base = SCRIPT_BASES[script]
+    tokens = []
+    pending = False  # last consonant still carries its inherent vowel
+    for char in run:
+        offset = ord(char) - base
+        if offset in CONSONANTS:
+            if pending:
+                tokens.append('@')
+            tokens.append(CONSONANTS[offset])
+            pending = True
+        elif offset in VOWEL_SIGNS:
+            tokens.append(VOWEL_SIGNS[offset])
+            pending = False
+        elif offset == VIRAMA:
+            pending = False
+        elif offset == NUKTA:
+            if tokens:
+                tokens[-1] = NUKTA_FORMS.get(tokens[-1], tokens[-1])
+        else:
+            if pending:
+                tokens.append('@')
+                pending = False
+            if offset in VOWELS:
+                tokens.append(VOWELS[offset])
+            elif offset in ANUSVARA:
+                tokens.append('M')
+            elif offset == VISARGA:
+                tokens.append('H')
+    if pending:
+        tokens.append('@')
+
+    if script == 'devanagari':
+        return _delete_schwas(tokens)
+    return ['a' if token == '@' else token for token in tokens]
+
+
+def _parse_latin(run):
+    """Convert a run of Latin letters into phoneme tokens"""
+    tokens = []
+    i = 0
+    while i < len(run):
+        for length in LATIN_RULE_LENGTHS:
+            rule = LATIN_RULES.get(run[i:i + length])
+            if rule:
+                tokens.extend(rule)
+                i += length
+                break
+        else:
+            i += 1
+    return tokens
+
+
+def to_phonemes(text):
+    """Convert Latin, Devanagari, Telugu, Tamil or Kannada text into phoneme tokens"""
+    text = unicodedata.normalize('NFC', str(text)).lower()
+    tokens = []
+    run, run_kind = [], None
+
+    def flush():
+        if run:
+            word = ''.join(run)
+            tokens.extend(_parse_latin(word) if run_kind == 'latin' else _parse_indic(word, run_kind))
+            run.clear()
+
+    for char in text:
+        if unicodedata.category(char) == 'Cf':
+            continue  # ZWJ/ZWNJ only shape conjuncts
+        kind = _script_of(char) or ('latin' if 'a' <= char <= 'z' else None)
+        if char.isdecimal():
+            kind = 'digit'
+        if kind != run_kind:
+            flush()
+            run_kind = kind
+        if kind == 'digit':
+            tokens.append(str(unicodedata.decimal(char)))  # any script's digits as ASCII
+        elif kind is None:
+            if tokens and tokens[-1] != ' ':
+                tokens.append(' ')
+        else:
+            run.append(char)
+    flush()
+
+    while tokens and tokens[-1] == ' ':
+        tokens.pop()
+    return tokens
+
+
+def phonetic_key(text):
+    """Return the canonical phonetic key shared by every spelling of a name
+
+    Besides KEY_FOLD, once a word has had its first vowel, later short vowels between
+    consonants all become 'a' (romanizations disagree on them: arikalu/arikelu,
+    jilakara/jilukara) and a word-final 'a'/'aa' after a consonant is dropped
+    (pesar/pesara). Digits and word breaks are kept, so 'Millet 29' and 'Millet 37' differ.
+    """
+    tokens = to_phonemes(text)
+    key = []
+    vowel_seen = False
+    for i, token in enumerate(tokens):
+        if token == ' ' or token.isdigit():
+            if token != ' ' or (key and key[-1] != ' '):
+                key.append(token)
+            vowel_seen = False
+            continue
+        after_consonant = i > 0 and tokens[i - 1] in CONSONANT_PHONEMES
+        following = tokens[i + 1] if i + 1 < len(tokens) else ' '
+        if vowel_seen and after_consonant and following == ' ' and token in ('a', 'aa'):
+            continue
+        if vowel_seen and after_consonant and following in CONSONANT_PHONEMES and token in KEY_WEAK_VOWELS:
+            token = 'a'
+        vowel_seen = vowel_seen or token in VOWEL_PHONEMES
+        folded = KEY_FOLD.get(token)
+        if folded and (not key or key[-1] != folded):
+            key.append(folded)
+    return ''.join(key).strip()
+
+
+def key_skeleton(key):
+    """Consonants and digits of a phonetic key, less any y/v glide right after a consonant ('kvinov' -> 'knv')"""
+    skeleton, previous = [], ' '
+    for char in key:
+        glide = char in 'yv' and previous not in KEY_VOWEL_LETTERS
+        if char not in KEY_VOWEL_LETTERS and not glide:
+            skeleton.append(char)
+        previous = char
+    return ''.join(skeleton)
+
+
+def transliterate(text, script):
+    """Render phonetic (or any supported script) text in the given Indic script"""
+    if script not in SCRIPT_BASES:
+        raise ValueError(f"Unsupported script: {script}")
+    base = SCRIPT_BASES[script]
+    fallbacks = SCRIPT_FALLBACKS[script]
+    tokens = to_phonemes(text)
+    if script == 'tamil':
+        # Tamil has no vocalic r; spell it out as a consonant and vowel
+        tokens = [t for token in tokens for t in (('r', 'i') if token == 'ri' else (token,))]
+
+    out = []
+    pending = False  # a consonant was written and still carries the inherent 'a'
+    for i, token in enumerate(tokens):
+        token = fallbacks.get(token, token)
+        if token in CONSONANT_PHONEMES or token in DEVANAGARI_NUKTA_BASES:
+            if pending:
+                out.append(chr(base + VIRAMA))
+            if script == 'devanagari' and token in DEVANAGARI_NUKTA_BASES:
+                out.append(chr(base + _CONSONANT_OFFSETS[DEVANAGARI_NUKTA_BASES[token]]))
+                out.append(chr(base + NUKTA))
+            else:
+                out.append(chr(base + _CONSONANT_OFFSETS[token]))
+            pending = True
+            continue
+
+        if token in VOWEL_PHONEMES:
+            if script == 'devanagari':
+                token = _DEVANAGARI_VOWEL_SHIFTS.get(token, token)
+            if pending:
+                word_end = i + 1 == len(tokens) or tokens[i + 1] == ' '
+                if token == 'a' and script == 'devanagari' and word_end:
+                    # A bare final consonant reads without its vowel in Hindi
+                    out.append(chr(base + _SIGN_OFFSETS['aa']))
+                elif token != 'a':
+                    out.append(chr(base + _SIGN_OFFSETS[token]))
+            else:
+                out.append(chr(base + _VOWEL_OFFSETS[token]))
+        elif token in ('M', 'H'):
+            out.append(chr(base + (ANUSVARA[1] if token == 'M' else VISARGA)))
+        else:
+            if pending and script != 'devanagari':
+                out.append(chr(base + VIRAMA))
+            out.append(token)
+        pending = False
+
+    if pending and script != 'devanagari':
+        out.append(chr(base + VIRAMA))
+    return unicodedata.normalize('NFC', ''.join(out))